@@ -0,0 +1,393 @@
+"""
+Benchmarks of the hot paths of the minesweeper game
+
+Times game construction, the opening first guess, preparing the tile
+sprites against a stub sweeperlib and writing and printing the scoreboard
+over a matrix of board sizes, difficulty densities and record counts.
+Results are written as JSON and compared against a stored baseline, the
+command exits with status 1 if any benchmark got slower than the allowed
+threshold:
+
+    $ python -m app.benchmark --save-baseline
+    $ python -m app.benchmark --output results.json
+
+Timings depend on the machine, so the baseline should be saved on the
+machine that the benchmarks are compared on.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from collections.abc import Callable, Iterator
+
+from app import scoreboard_logging
+from app import sprite_helper
+from app.game import game_constants
+from app.game.game_state import Game
+from app.simulation import ENGINES
+
+BENCHMARK_BOARD_SIZES = [8, 16, 30, 100, 300]
+BENCHMARK_RECORD_COUNTS = [10**3, 10**4, 10**5, 10**6]
+# Smaller matrix of `--quick` runs
+QUICK_BOARD_SIZES = [8, 16, 30]
+QUICK_RECORD_COUNTS = [10**3, 10**4]
+
+BASELINE_FILENAME = "app/benchmark_baseline.json"
+# Allowed slowdown against the baseline before a benchmark counts as a regression
+REGRESSION_THRESHOLD = 0.25
+# Shortest time of one timed round, fast benchmarks are run several times per round
+MIN_ROUND_TIME = 0.05
+# Records appended into the benchmark scoreboard at a time while filling it
+FILL_BATCH_SIZE = 10000
+
+DIFFICULTY_NAMES = {
+    game_constants.DIFFICULTY_EASY: "easy",
+    game_constants.DIFFICULTY_MEDIUM: "medium",
+    game_constants.DIFFICULTY_HARD: "hard"
+}
+
+# Creates the state of one timed call, the setup is not timed
+Setup = Callable[[], object]
+# The timed call, given the state created by the setup
+Run = Callable[[object], object]
+
+class StubSweeperlib:
+    """
+    Stand-in for `app.lib.sweeperlib` that keeps the sprite slots in
+    a dictionary without pyglet, so that only the work of the sprite
+    helper itself is timed
+    """
+    slots: dict
+
+    def __init__(self):
+        """
+        Initializes the stub without sprites
+        """
+        self.slots = {}
+
+    def set_sprite(self, slot, key, x, y, layer=0, scale=1.0):
+        """
+        Stores the sprite of a slot
+
+        :param slot: identifier of the sprite slot
+        :param str key: key, used to select the sprite
+        :param int x: x coordinate of the bottom left corner
+        :param int y: y coordinate of the bottom left corner
+        :param int layer: drawing order of the sprite
+        :param float scale: scale of the sprite
+        """
+        self.slots[slot] = (key, x, y, layer, scale)
+
+    def hide_sprite(self, slot):
+        """
+        Removes the sprite of a slot
+
+        :param slot: identifier of the sprite slot
+        """
+        self.slots.pop(slot, None)
+
+    def can_draw_tilemaps(self):
+        """
+        The stub has no texture atlas
+        """
+        return False
+
+def time_benchmark(setup: Setup, run: Run, repeat: int) -> float:
+    """
+    Returns the shortest time in seconds of one call of `run`
+
+    Calls that take less than `MIN_ROUND_TIME` are repeated within
+    a round and the round time is divided by the amount of calls
+
+    :params Setup setup: function creating the state of one call
+    :params Run run: timed function
+    :params int repeat: amount of timed rounds
+    """
+    number = 1
+    best = float("inf")
+    rounds = 0
+    while rounds < repeat:
+        states = [setup() for _ in range(number)]
+        start = time.perf_counter()
+        for state in states:
+            run(state)
+        elapsed = time.perf_counter() - start
+        if elapsed < MIN_ROUND_TIME and number < 10**6:
+            # Calibrating rounds are not counted
+            number *= 10
+            continue
+        best = min(best, elapsed / number)
+        rounds += 1
+    return best
+
+def make_game(engine: type[Game], size: int, difficulty: int, seed: int) -> Game:
+    """
+    Creates a new square game with the mine density of the difficulty
+
+    :params type[Game] engine: board engine
+    :params int size: width and height of the board
+    :params int difficulty: difficulty identifier found in `game_constants.py`
+    :params int seed: seed of the mine placement
+    """
+    density = game_constants.DIFFICULTY_MINE_DENSITY[difficulty]
+    return engine((size, size), round(size * size * density), seed)
+
+def make_opened_game(engine: type[Game], size: int, difficulty: int, seed: int) -> Game:
+    """
+    Creates a game whose first guess has been made in the middle of the board
+
+    :params type[Game] engine: board engine
+    :params int size: width and height of the board
+    :params int difficulty: difficulty identifier found in `game_constants.py`
+    :params int seed: seed of the mine placement
+    """
+    game = make_game(engine, size, difficulty, seed)
+    game.guess_tile((size // 2, size // 2))
+    return game
+
+def prepare_sprites(helper: sprite_helper.SpriteHelper):
+    """
+    Prepares all tile sprites of a sprite helper against a stub sweeperlib
+
+    :params SpriteHelper helper: sprite helper of the drawn game
+    """
+    sweeperlib = sprite_helper.sweeperlib
+    sprite_helper.sweeperlib = StubSweeperlib()
+    try:
+        helper.prepare_tile_sprites()
+    finally:
+        sprite_helper.sweeperlib = sweeperlib
+
+def iter_game_benchmarks(engine_names: list[str],
+                         sizes: list[int]) -> Iterator[tuple[str, Setup, Run]]:
+    """
+    Yields the (name, setup, run) benchmarks of the board engines
+    for every board size and difficulty density
+
+    :params list[str] engine_names: keys of the board engines in `ENGINES`
+    :params list[int] sizes: widths and heights of the boards
+    """
+    for engine_name in engine_names:
+        engine = ENGINES[engine_name]
+        for size in sizes:
+            for difficulty, difficulty_name in DIFFICULTY_NAMES.items():
+                case = f"{engine_name}/{size}x{size}/{difficulty_name}"
+                # Every call gets a board of its own, all with the same mines
+                seed = random.Random(case).getrandbits(game_constants.SEED_BITS)
+                yield (f"construct/{case}",
+                       lambda: None,
+                       lambda _, engine=engine, size=size, difficulty=difficulty, seed=seed:
+                           make_game(engine, size, difficulty, seed))
+                yield (f"first-guess/{case}",
+                       lambda engine=engine, size=size, difficulty=difficulty, seed=seed:
+                           make_game(engine, size, difficulty, seed),
+                       lambda game, size=size: game.guess_tile((size // 2, size // 2)))
+                yield (f"tile-sprites/{case}",
+                       lambda engine=engine, size=size, difficulty=difficulty, seed=seed:
+                           sprite_helper.SpriteHelper(
+                               make_opened_game(engine, size, difficulty, seed)),
+                       prepare_sprites)
+
+def make_records(count: int, rng: random.Random) -> list[dict]:
+    """
+    Returns random score records of finished games
+
+    :params int count: amount of records
+    :params random.Random rng: random number generator of the records
+    """
+    records = []
+    for _ in range(count):
+        size = rng.choice(BENCHMARK_BOARD_SIZES[:3])
+        records.append(scoreboard_logging.make_score_record(
+            f"player{rng.randrange(100)}",
+            rng.choice(list(DIFFICULTY_NAMES)),
+            rng.randrange(1, 200),
+            rng.randrange(1, game_constants.STARTING_TIME),
+            rng.choice([0, rng.randrange(1, size * size)]),
+            (size, size)))
+    return records
+
+def write_score():
+    """
+    Writes the score of one game into the scoreboard
+    """
+    scoreboard_logging.write_scoreboard_data(
+        "benchmark", game_constants.DIFFICULTY_EASY, 10, 100, 0, (8, 8))
+
+def print_scores():
+    """
+    Prints the first page of the scoreboard into a discarded buffer
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        scoreboard_logging.print_scores()
+
+def iter_scoreboard_benchmarks(record_counts: list[int],
+                               name_filter: str | None = None) -> Iterator[tuple[str, Setup, Run]]:
+    """
+    Yields the (name, setup, run) benchmarks of writing and printing
+    the scoreboard of every backend with the given amounts of records
+
+    The scoreboards are kept in a temporary directory that is the working
+    directory while the benchmarks run. The scoreboard is filled to the next
+    record count before its benchmarks are yielded, the few records written
+    by the write benchmarks are left on top of the count. Scoreboards
+    without any benchmark matching the filter are not filled
+
+    :params list[int] record_counts: amounts of records on the scoreboard
+    :params str | None name_filter: only benchmarks whose name contains this are yielded
+    """
+    backend = scoreboard_logging.SCOREBOARD_BACKEND
+    working_directory = os.getcwd()
+    try:
+        for backend_name in ("sqlite", "jsonl"):
+            with tempfile.TemporaryDirectory() as directory:
+                os.chdir(directory)
+                os.mkdir("app")
+                scoreboard_logging.SCOREBOARD_BACKEND = backend_name
+                rng = random.Random(backend_name)
+                filled = 0
+                for count in sorted(record_counts):
+                    names = [f"write-score/{backend_name}/{count}",
+                             f"print-scores/{backend_name}/{count}"]
+                    if name_filter is not None and all(name_filter not in name
+                                                       for name in names):
+                        continue
+                    while filled < count:
+                        batch = min(FILL_BATCH_SIZE, count - filled)
+                        scoreboard_logging.append_records(make_records(batch, rng))
+                        filled += batch
+                    yield names[0], lambda: None, lambda _: write_score()
+                    yield names[1], lambda: None, lambda _: print_scores()
+                os.chdir(working_directory)
+    finally:
+        os.chdir(working_directory)
+        scoreboard_logging.SCOREBOARD_BACKEND = backend
+
+def run_benchmarks(benchmarks: Iterator[tuple[str, Setup, Run]],
+                   repeat: int,
+                   name_filter: str | None = None) -> dict[str, float]:
+    """
+    Runs the benchmarks and prints their times as they finish
+
+    Returns the times in seconds by benchmark name
+
+    :params Iterator benchmarks: (name, setup, run) benchmarks
+    :params int repeat: amount of timed rounds of each benchmark
+    :params str | None name_filter: only benchmarks whose name contains this are run
+    """
+    results = {}
+    for name, setup, run in benchmarks:
+        if name_filter is not None and name_filter not in name:
+            continue
+        results[name] = time_benchmark(setup, run, repeat)
+        print(f"{name:<40} {results[name] * 1000:12.4f} ms")
+    return results
+
+def compare_results(results: dict[str, float],
+                    baseline: dict[str, float],
+                    threshold: float = REGRESSION_THRESHOLD) -> list[str]:
+    """
+    Prints the change of each benchmark against the baseline
+
+    Returns the names of the benchmarks that are slower than
+    the baseline by more than the threshold
+
+    :params dict[str, float] results: times in seconds by benchmark name
+    :params dict[str, float] baseline: baseline times in seconds by benchmark name
+    :params float threshold: allowed slowdown as a share of the baseline time
+    """
+    regressions = []
+    print("\n--    Compared to baseline    --")
+    for name, seconds in results.items():
+        if name not in baseline:
+            print(f"{name:<40} {'no baseline':>12}")
+            continue
+        change = seconds / baseline[name] - 1
+        status = ""
+        if change > threshold:
+            status = " REGRESSION"
+            regressions.append(name)
+        print(f"{name:<40} {change:+12.1%}{status}")
+    return regressions
+
+def load_results(filename: str) -> dict[str, float] | None:
+    """
+    Returns the times of a results file, None if the file does not exist
+
+    :params str filename: results file written by `save_results`
+    """
+    try:
+        with open(filename, 'r', encoding="UTF-8") as results_file:
+            return json.load(results_file)["results"]
+    except FileNotFoundError:
+        return None
+
+def save_results(filename: str, results: dict[str, float]):
+    """
+    Writes the times into a JSON file with the Python version and platform
+
+    :params str filename: results file
+    :params dict[str, float] results: times in seconds by benchmark name
+    """
+    with open(filename, 'w', encoding="UTF-8") as results_file:
+        json.dump({
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "results": results
+        }, results_file, indent=2)
+        results_file.write("\n")
+
+def main():
+    """
+    Command line entry point for running the benchmarks
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the mine sweeper hot paths")
+    parser.add_argument("--quick", action="store_true",
+                        help="run only the classic board sizes and up to 10^4 records")
+    parser.add_argument("--engine", choices=ENGINES, nargs="+", default=["list"])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--filter", help="run only benchmarks whose name contains this")
+    parser.add_argument("--output", help="file the results are written into")
+    parser.add_argument("--baseline", default=BASELINE_FILENAME)
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="store the results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD)
+    args = parser.parse_args()
+
+    sizes = QUICK_BOARD_SIZES if args.quick else BENCHMARK_BOARD_SIZES
+    record_counts = QUICK_RECORD_COUNTS if args.quick else BENCHMARK_RECORD_COUNTS
+
+    # Relative paths are resolved before the scoreboard benchmarks change directory
+    output = None if args.output is None else os.path.abspath(args.output)
+    baseline_filename = os.path.abspath(args.baseline)
+
+    results = run_benchmarks(iter_game_benchmarks(args.engine, sizes), args.repeat, args.filter)
+    results.update(run_benchmarks(iter_scoreboard_benchmarks(record_counts, args.filter),
+                                  args.repeat, args.filter))
+
+    if output is not None:
+        save_results(output, results)
+    if args.save_baseline:
+        save_results(baseline_filename, results)
+        print(f"\nBaseline saved into {args.baseline}")
+        return
+
+    baseline = load_results(baseline_filename)
+    if baseline is None:
+        print(f"\nNo baseline in {args.baseline}, save one with --save-baseline")
+        return
+    regressions = compare_results(results, baseline, args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} benchmarks slower than the baseline "
+              f"by more than {args.threshold:.0%}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Offscreen renderer of game boards
+
+Renders the board of a `Game` into an image without a window,
+for thumbnails of finished games, replay frames and visual regression
+tests. The sprites are loaded into NumPy arrays once, and a board is
+composed by copying every tile sprite into place with a single fancy
+indexing operation. Requires the optional NumPy dependency.
+"""
+
+import os
+
+import numpy as np # pylint: disable=import-error
+
+from app.game.game_state import Game
+from app.lib.atlas import SPRITE_FILES, read_manifest
+from app.lib.png import read_png, encode_png
+from app.sprite_helper import get_tile_draw_key
+
+# Sprite keys that tiles can be drawn with
+TILE_DRAW_KEYS = ('0', '1', '2', '3', '4', '5', '6', '7', '8', 'x', ' ', 'f', 'X', 'F')
+
+# Fast compression, rendered frames are usually written in bulk
+RENDER_PNG_COMPRESSION = 1
+
+class BoardRenderer:
+    """
+    Renderer holding the tile sprites as a stacked array
+
+    Images are indexed [row, column, channel] with row 0 at the top,
+    so the board is flipped compared to the window where y grows upwards.
+    They have RGB channels if all tile sprites are opaque and RGBA otherwise
+    """
+    key_codes: dict[str, int]
+    tile_sprites: np.ndarray
+    scaled_tile_sprites: dict[int, np.ndarray]
+
+    def __init__(self, path: str = "resources/sprites"):
+        """
+        Loads the tile sprites from the texture atlas of the sprite
+        directory, or from the separate images if it has no atlas
+
+        :params str path: sprite directory
+        """
+        self.key_codes = {key: code for code, key in enumerate(TILE_DRAW_KEYS)}
+
+        manifest = read_manifest(path)
+        if manifest is not None:
+            atlas_width, atlas_height, pixels = read_png(os.path.join(path, manifest["image"]))
+            atlas = np.frombuffer(pixels, dtype=np.uint8).reshape(atlas_height, atlas_width, 4)
+            sprites = []
+            for key in TILE_DRAW_KEYS:
+                # Manifest regions measure y from the bottom of the atlas
+                x_position, y_position, width, height = manifest["regions"][key]
+                top = atlas_height - y_position - height
+                sprites.append(atlas[top:top + height, x_position:x_position + width])
+        else:
+            sprites = []
+            for key in TILE_DRAW_KEYS:
+                width, height, pixels = read_png(os.path.join(path, SPRITE_FILES[key]))
+                sprites.append(np.frombuffer(pixels, dtype=np.uint8).reshape(height, width, 4))
+
+        self.tile_sprites = np.stack(sprites)
+        if (self.tile_sprites[..., 3] == 255).all():
+            # Opaque sprites are kept as RGB so that images are smaller and faster to encode
+            self.tile_sprites = np.ascontiguousarray(self.tile_sprites[..., :3])
+        self.scaled_tile_sprites = {1: self.tile_sprites}
+
+    def get_tile_sprites(self, scale: int) -> np.ndarray:
+        """
+        Returns the tile sprites shrunk by the given integer factor
+
+        Shrunk sprites are created once per factor by keeping every
+        `scale`th pixel, which is enough for thumbnails
+
+        :params int scale: factor by which the sprites are shrunk
+        """
+        if scale not in self.scaled_tile_sprites:
+            self.scaled_tile_sprites[scale] = np.ascontiguousarray(
+                self.tile_sprites[:, ::scale, ::scale])
+        return self.scaled_tile_sprites[scale]
+
+    def get_tile_codes(self, game_state: Game) -> np.ndarray:
+        """
+        Returns the index of the tile sprite of every tile as
+        a (y-size, x-size) array, with the same draw keys as `SpriteHelper`
+
+        :params Game game_state: game to be rendered
+        """
+        x_size, y_size = game_state.board_size
+        codes = np.fromiter(
+            (self.key_codes[get_tile_draw_key(game_state, (x_index, y_index))]
+             for y_index in range(y_size)
+             for x_index in range(x_size)),
+            dtype=np.intp,
+            count=x_size * y_size)
+        return codes.reshape(y_size, x_size)
+
+    def render(self, game_state: Game, scale: int = 1) -> np.ndarray:
+        """
+        Renders the board into a (height, width, channels) array
+
+        :params Game game_state: game to be rendered
+        :params int scale: factor by which the image is shrunk
+        """
+        tile_sprites = self.get_tile_sprites(scale)
+        tile_height, tile_width = tile_sprites.shape[1:3]
+        # The top row of the image is the last row of the board
+        codes = self.get_tile_codes(game_state)[::-1]
+        y_size, x_size = codes.shape
+
+        # (y, x, row, column, channel) -> (y, row, x, column, channel)
+        blocks = tile_sprites[codes].transpose(0, 2, 1, 3, 4)
+        return blocks.reshape(y_size * tile_height, x_size * tile_width, tile_sprites.shape[3])
+
+    def render_png(self, game_state: Game, scale: int = 1) -> bytes:
+        """
+        Renders the board into PNG bytes
+
+        :params Game game_state: game to be rendered
+        :params int scale: factor by which the image is shrunk
+        """
+        image = self.render(game_state, scale)
+        return encode_png(image.shape[1], image.shape[0], image,
+                          RENDER_PNG_COMPRESSION, alpha=image.shape[2] == 4)
+
+    def save_png(self, game_state: Game, path: str, scale: int = 1):
+        """
+        Renders the board into a PNG file
+
+        :params Game game_state: game to be rendered
+        :params str path: path of the PNG file
+        :params int scale: factor by which the image is shrunk
+        """
+        with open(path, "wb") as png_file:
+            png_file.write(self.render_png(game_state, scale))
@@ -4,6 +4,24 @@ Game sub-package for mine sweeper
 
 from .game_state import Game
 from .game_handler import GameHandler
+from .solver import Solver
 from .game_constants import *
 
-__all__ = ["Game", "GameHandler"]
+__all__ = ["Game", "GameHandler", "Solver"]
+
+def __getattr__(name: str):
+    """
+    Imports `NumpyGame` on first access so that NumPy is not
+    loaded by programs that do not use it
+
+    `NumpyGame` is None if NumPy is not installed
+    """
+    if name != "NumpyGame":
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    try:
+        from .numpy_game_state import NumpyGame # pylint: disable=import-outside-toplevel
+    except ImportError:
+        # NumPy is an optional dependency
+        NumpyGame = None
+    globals()["NumpyGame"] = NumpyGame
+    return NumpyGame
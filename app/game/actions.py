@@ -0,0 +1,40 @@
+"""
+Actions applied on a game in batches with `Game.apply_actions`
+
+An action is an (action, tile) tuple. Reveal and toggle-flag actions
+use the same values as the moves of a move log, so a decoded move log
+can be applied as a batch of actions.
+"""
+
+from .move_log import MOVE_REVEAL, MOVE_FLAG
+
+ACTION_REVEAL = MOVE_REVEAL
+ACTION_TOGGLE_FLAG = MOVE_FLAG
+ACTION_FLAG = 2
+ACTION_UNFLAG = 3
+ACTION_CHORD = 4
+
+# An action with the (x,y) index-coordinates of its tile
+Action = tuple[int, tuple[int, int]]
+
+class ActionDelta:
+    """
+    Aggregate changes of a batch of actions
+    """
+    explored: list[tuple[int, int]]
+    flagged: list[tuple[int, int]]
+    unflagged: list[tuple[int, int]]
+    turns: int
+    game_over: bool
+    win: bool
+
+    def __init__(self):
+        """
+        Initializes a delta without any changes
+        """
+        self.explored = []
+        self.flagged = []
+        self.unflagged = []
+        self.turns = 0
+        self.game_over = False
+        self.win = False
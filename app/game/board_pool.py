@@ -0,0 +1,177 @@
+"""
+Generator and pool of boards that can be solved without guessing
+
+A board is kept only if the deterministic `Solver` can win it from
+the starting tile without guessing. Because many candidates may be
+rejected, boards are generated in background worker processes into
+a bounded pool keyed by (board size, mine count). The workers are
+started with the program and a key is filled as soon as its board size
+and mine count are known, so the board is usually ready when the game
+starts. Boards denser than `NO_GUESS_MAX_MINE_DENSITY` are not offered.
+"""
+
+import multiprocessing
+import multiprocessing.pool
+import random
+from collections import deque
+
+from .game_state import Game
+from .solver import Solver
+from .game_constants import (NO_GUESS_POOL_CAPACITY, NO_GUESS_MAX_ATTEMPTS,
+                             NO_GUESS_MAX_MINE_DENSITY, CLASSIC_BOARD_MAX_SIZE, SEED_BITS)
+
+# A generated board as (starting tile, seed of the game), the mines
+# are placed by a `Game` with the seed when the starting tile is guessed
+Board = tuple[tuple[int, int], int]
+
+def is_no_guess_supported(board_size: tuple[int, int], mine_count: int) -> bool:
+    """
+    Returns True if no-guess boards can be generated for the given key
+
+    Chunked boards and boards denser than `NO_GUESS_MAX_MINE_DENSITY`
+    are not supported
+
+    :params tuple[int, int] board_size: board size in (x-size, y-size) format
+    :params int mine_count: number of mines on the board
+    """
+    return (max(board_size) <= CLASSIC_BOARD_MAX_SIZE
+            and mine_count <= board_size[0] * board_size[1] * NO_GUESS_MAX_MINE_DENSITY)
+
+def generate_no_guess_board(board_size: tuple[int, int],
+                            mine_count: int,
+                            seed: int,
+                            max_attempts: int = NO_GUESS_MAX_ATTEMPTS) -> Board | None:
+    """
+    Generates random boards until one can be solved without guessing
+    when the game is started from the middle of the board
+
+    Returns the board or None if no board was found in `max_attempts` attempts
+
+    :params tuple[int, int] board_size: board size in (x-size, y-size) format
+    :params int mine_count: number of mines on the board
+    :params int seed: seed from which the seeds of the candidate games are drawn
+    :params int max_attempts: number of candidate boards to try
+    """
+    rng = random.Random(seed)
+    start_tile = (board_size[0] // 2, board_size[1] // 2)
+    for _ in range(max_attempts):
+        game = Game(board_size, mine_count, rng.getrandbits(SEED_BITS))
+        solver = Solver(game)
+        solver.guess_tile(start_tile)
+        if solver.play(allow_guessing=False):
+            return start_tile, game.seed
+    return None
+
+class BoardPool:
+    """
+    Bounded pool of pregenerated no-guess boards
+
+    Worker processes are started with `start` or on the first request
+    and keep up to `capacity` boards ready for each requested board key
+    """
+    capacity: int
+    processes: int | None
+    worker_pool: multiprocessing.pool.Pool | None
+    ready: dict[tuple[tuple[int, int], int], deque]
+    pending: dict[tuple[tuple[int, int], int], list[multiprocessing.pool.AsyncResult]]
+
+    def __init__(self, capacity: int = NO_GUESS_POOL_CAPACITY, processes: int | None = None):
+        """
+        Initializes an empty pool without starting the worker processes
+
+        :params int capacity: amount of boards kept ready per board key
+        :params int | None processes: number of worker processes, defaults to CPU count
+        """
+        self.capacity = capacity
+        self.processes = processes
+        self.worker_pool = None
+        self.ready = {}
+        self.pending = {}
+
+    def start(self):
+        """
+        Starts the worker processes if they are not running
+        """
+        if self.worker_pool is None:
+            self.worker_pool = multiprocessing.Pool(self.processes)
+
+    def fill(self, board_size: tuple[int, int], mine_count: int):
+        """
+        Starts generating boards in the background until `capacity` boards
+        for the given key are ready or being generated
+
+        Keys that are not supported by `is_no_guess_supported` are ignored
+
+        :params tuple[int, int] board_size: board size in (x-size, y-size) format
+        :params int mine_count: number of mines on the board
+        """
+        if not is_no_guess_supported(board_size, mine_count):
+            return
+        self.start()
+
+        key = (board_size, mine_count)
+        ready = self.ready.setdefault(key, deque())
+        pending = self.pending.setdefault(key, [])
+        while len(ready) + len(pending) < self.capacity:
+            pending.append(self.worker_pool.apply_async(
+                generate_no_guess_board,
+                (board_size, mine_count, random.getrandbits(SEED_BITS))))
+
+    def collect(self, key: tuple[tuple[int, int], int]) -> bool:
+        """
+        Moves the finished boards of the given key into the ready boards
+
+        Returns False if any worker gave up without finding a board
+
+        :params tuple key: board key as (board size, mine count)
+        """
+        found_all = True
+        still_pending = []
+        for result in self.pending.get(key, []):
+            if not result.ready():
+                still_pending.append(result)
+                continue
+            board = result.get()
+            if board is None:
+                found_all = False
+            else:
+                self.ready[key].append(board)
+        self.pending[key] = still_pending
+        return found_all
+
+    def take(self, board_size: tuple[int, int], mine_count: int) -> Board | None:
+        """
+        Takes a ready board from the pool and starts generating its replacement
+
+        If no board is ready, waits for the first worker to finish
+
+        Returns None if the workers could not find a board without guessing
+        or the key is not supported by `is_no_guess_supported`
+
+        :params tuple[int, int] board_size: board size in (x-size, y-size) format
+        :params int mine_count: number of mines on the board
+        """
+        if not is_no_guess_supported(board_size, mine_count):
+            return None
+        key = (board_size, mine_count)
+        self.fill(board_size, mine_count)
+        while True:
+            found_all = self.collect(key)
+            if self.ready[key]:
+                board = self.ready[key].popleft()
+                self.fill(board_size, mine_count)
+                return board
+            if not found_all:
+                return None
+            self.pending[key][0].wait(0.05)
+
+    def close(self):
+        """
+        Stops the worker processes and discards the generated boards
+        """
+        if self.worker_pool is not None:
+            self.worker_pool.terminate()
+            self.worker_pool.join()
+            self.worker_pool = None
+        self.ready.clear()
+        self.pending.clear()
@@ -0,0 +1,78 @@
+"""
+Module that includes the change journal of the game-object
+
+The journal records what changed in the game state since it was last
+cleared so that drawing can update only the affected sprites
+"""
+
+class ChangeJournal:
+    """
+    Record of game state changes since the last `clear`
+
+    A new journal starts as `full` so that everything is drawn once
+    """
+    full: bool
+    tiles: set[tuple[int, int]]
+    timer: bool
+    mine_counter: bool
+    status: bool
+
+    def __init__(self):
+        """
+        Initializes a journal where everything is changed
+        """
+        self.tiles = set()
+        self.clear()
+        self.full = True
+
+    def record_tiles(self, tiles: list[tuple[int, int]]):
+        """
+        Records tiles that were explored or had their flag toggled
+
+        :params list[tuple[int, int]] tiles: changed tiles
+        """
+        self.tiles.update(tiles)
+
+    def record_flag(self, tile: tuple[int, int]):
+        """
+        Records a toggled flag, which also changes the mine counter
+
+        :params tuple[int, int] tile: tile whose flag was toggled
+        """
+        self.tiles.add(tile)
+        self.mine_counter = True
+
+    def record_status(self):
+        """
+        Records a game-over or win transition
+
+        Flagged tiles are drawn differently after a loss,
+        so the whole board is marked as changed
+        """
+        self.status = True
+        self.full = True
+
+    def record_view(self):
+        """
+        Records a scroll or zoom of the board view, which moves
+        every drawn tile, so the whole board is marked as changed
+        """
+        self.full = True
+
+    @property
+    def has_changes(self) -> bool:
+        """
+        True if anything has changed since the last `clear`
+        """
+        return (self.full or self.timer or self.mine_counter
+                or self.status or len(self.tiles) > 0)
+
+    def clear(self):
+        """
+        Forgets all recorded changes
+        """
+        self.full = False
+        self.tiles.clear()
+        self.timer = False
+        self.mine_counter = False
+        self.status = False
@@ -0,0 +1,548 @@
+"""
+Module that includes the chunked game-object for huge boards
+
+The board is split into square chunks that are created only when
+they are touched. The mine count of each chunk is drawn by splitting
+the total mine count between halves of the chunk range with
+hypergeometric draws, so every chunk gets its mines from the seed
+without generating the rest of the board and the counts are
+distributed as if the mines were placed uniformly on the whole
+board. Memory and generation time grow with the explored area, not
+with the size of the board.
+"""
+
+import random
+from collections import deque
+from math import exp, lgamma
+
+from .game_state import Game
+from .game_constants import BOARD_CHUNK_SIZE
+from .tile_index import TILE_EXPLORED, TILE_FLAGGED
+
+def hypergeometric_variate(rng: random.Random, population: int, successes: int, draws: int) -> int:
+    """
+    Returns the amount of successes among `draws` items drawn without
+    replacement from a population holding `successes` successes
+
+    Inverts the distribution starting from its mode and moving towards
+    the more probable neighbour, so a draw takes steps in proportion
+    to the standard deviation rather than to the population
+
+    :params random.Random rng: random number generator of the draw
+    :params int population: size of the population
+    :params int successes: successes in the population
+    :params int draws: items drawn
+    """
+    failures = population - successes
+    lowest, highest = max(0, draws - failures), min(draws, successes)
+    if lowest == highest:
+        return lowest
+
+    mode = min(max((draws + 1) * (successes + 1) // (population + 2), lowest), highest)
+    mode_probability = exp(lgamma(successes + 1) - lgamma(mode + 1) - lgamma(successes - mode + 1)
+                           + lgamma(failures + 1) - lgamma(draws - mode + 1)
+                           - lgamma(failures - draws + mode + 1)
+                           - lgamma(population + 1) + lgamma(draws + 1)
+                           + lgamma(population - draws + 1))
+    remaining = rng.random() - mode_probability
+    below, above = mode, mode
+    below_probability = above_probability = mode_probability
+    while remaining > 0 and (below > lowest or above < highest):
+        next_below = next_above = 0.0
+        if below > lowest:
+            next_below = below_probability * (below * (failures - draws + below)
+                                              / ((successes - below + 1) * (draws - below + 1)))
+        if above < highest:
+            next_above = above_probability * ((successes - above) * (draws - above)
+                                              / ((above + 1) * (failures - draws + above + 1)))
+        if next_above >= next_below:
+            above, above_probability = above + 1, next_above
+            remaining -= next_above
+            if remaining <= 0:
+                return above
+        else:
+            below, below_probability = below - 1, next_below
+            remaining -= next_below
+            if remaining <= 0:
+                return below
+    return mode
+
+class ChunkedGame(Game):
+    """
+    Game whose board is stored in lazily created chunks
+
+    Chunks are numbered row by row, chunk (x, y) covers the tiles
+    from (x * chunk size, y * chunk size) onwards. Mines, neighbour
+    counts and tile states are kept per chunk in separate dictionaries
+    so that reading a tile does not create its state. Every chunk is
+    stored as a full row-major square, the tiles of edge chunks that
+    are outside the board never have mines.
+
+    Mines set with `set_mines` or `set_tile_content` are kept in
+    `placed_mines`, which takes precedence over the generated chunks.
+    After `set_mines` chunks without placed mines are empty.
+    """
+    engine_name = "chunked"
+    chunk_size: int
+    chunk_columns: int
+    chunk_rows: int
+    safe_zone: set[int]
+    range_splits: dict[tuple[int, int], int]
+    chunk_mines: dict[tuple[int, int], bytearray]
+    placed_mines: dict[tuple[int, int], bytearray]
+    mines_from_seed: bool
+    chunk_counts: dict[tuple[int, int], bytearray]
+    chunk_states: dict[tuple[int, int], bytearray]
+    empty_chunk: bytes
+    n_explored: int
+    n_flagged: int
+    exploded_tile: tuple[int, int] | None
+    # Largest amount of tiles explored by one guess, None for no limit
+    opening_limit: int | None = None
+
+    def __init__(self,
+                 board_size: tuple[int, int],
+                 mine_count: int,
+                 seed: int | None = None,
+                 chunk_size: int = BOARD_CHUNK_SIZE):
+        """
+        Initialize the object attributes
+        `mine_count` amount of mines are placed randomly on the first guess
+
+        :params int board_size: board size in (x-size, y-size) format
+        :params int mine_count: number of mines to be placed
+        :params int | None seed: seed of the mine placement, random if None
+        :params int chunk_size: width and height of a chunk in tiles
+        """
+        self.chunk_size = chunk_size
+        super().__init__(board_size, mine_count, seed)
+
+    def init_board(self):
+        """
+        Builds an empty board without any chunks
+        """
+        self.chunk_columns = -(-self.board_size[0] // self.chunk_size)
+        self.chunk_rows = -(-self.board_size[1] // self.chunk_size)
+        self.mines_placed = False
+        self.safe_zone = set()
+        self.range_splits = {}
+        self.chunk_mines = {}
+        self.placed_mines = {}
+        self.mines_from_seed = True
+        self.chunk_counts = {}
+        self.chunk_states = {}
+        self.empty_chunk = bytes(self.chunk_size * self.chunk_size)
+        self.n_explored = 0
+        self.n_flagged = 0
+        self.exploded_tile = None
+
+    def place_mines(self, safe_tile: tuple[(int, int)] | None = None):
+        """
+        Fixes the tiles that are kept free of mines, the mines
+        themselves are generated chunk by chunk when needed
+
+        The safe tile and its surroundings are kept free of mines.
+        If there are too many mines for that, only the safe tile is kept free
+
+        :params tuple[(int, int)] | None safe_tile: tile to keep free of mines
+        """
+        total_tiles = self.board_size[0] * self.board_size[1]
+        if safe_tile is not None:
+            self.safe_zone = self.get_safe_zone(safe_tile)
+            if total_tiles - len(self.safe_zone) < self.mine_count:
+                self.safe_zone = {safe_tile[1] * self.board_size[0] + safe_tile[0]}
+        self.mines_placed = True
+
+    def set_mines(self, mine_indices: list[int]):
+        """
+        Places mines on the given tiles instead of generating them from
+        the seed, the neighbour counts of each chunk are computed when
+        the chunk is first used
+
+        :params list[int] mine_indices: flat indices (y * x-size + x) of the mines
+        """
+        size = self.chunk_size
+        x_size = self.board_size[0]
+        self.placed_mines = {}
+        for index in mine_indices:
+            y_index, x_index = divmod(index, x_size)
+            chunk = (x_index // size, y_index // size)
+            if chunk not in self.placed_mines:
+                self.placed_mines[chunk] = bytearray(size * size)
+            self.placed_mines[chunk][y_index % size * size + x_index % size] = 1
+        self.mines_from_seed = False
+        self.chunk_mines.clear()
+        self.chunk_counts.clear()
+        self.mines_placed = True
+
+    def get_chunk_bounds(self, chunk: tuple[int, int]) -> tuple[int, int, int, int]:
+        """
+        Returns the (x, y, width, height) of the tiles of a chunk,
+        chunks on the right and top edges may be smaller
+
+        :params tuple[int, int] chunk: chunk (x,y) coordinates
+        """
+        x_origin, y_origin = chunk[0] * self.chunk_size, chunk[1] * self.chunk_size
+        return (x_origin, y_origin,
+                min(self.chunk_size, self.board_size[0] - x_origin),
+                min(self.chunk_size, self.board_size[1] - y_origin))
+
+    def get_leading_area(self, chunk_number: int) -> int:
+        """
+        Returns the amount of tiles in the chunks numbered below `chunk_number`
+        that are not in the safe zone
+
+        :params int chunk_number: number of a chunk, or the amount of chunks
+        """
+        x_size, y_size = self.board_size
+        full_rows, columns = divmod(chunk_number, self.chunk_columns)
+        area = x_size * min(full_rows * self.chunk_size, y_size)
+        if columns:
+            row_height = min(self.chunk_size, y_size - full_rows * self.chunk_size)
+            area += min(columns * self.chunk_size, x_size) * row_height
+
+        for index in self.safe_zone:
+            x_index, y_index = index % x_size, index // x_size
+            safe_chunk_number = ((y_index // self.chunk_size) * self.chunk_columns
+                                 + x_index // self.chunk_size)
+            if safe_chunk_number < chunk_number:
+                area -= 1
+        return area
+
+    def get_chunk_mine_count(self, chunk: tuple[int, int]) -> int:
+        """
+        Returns the amount of mines in a chunk
+
+        The mines of a range of chunks are split between its halves with a
+        hypergeometric draw seeded by the range. Descending from the whole
+        board to the chunk gives an exact total without looking at the
+        other chunks
+
+        :params tuple[int, int] chunk: chunk (x,y) coordinates
+        """
+        chunk_number = chunk[1] * self.chunk_columns + chunk[0]
+        low, high = 0, self.chunk_columns * self.chunk_rows
+        mine_count = self.mine_count
+        while high - low > 1:
+            middle = (low + high) // 2
+            if (low, high) not in self.range_splits:
+                low_area = self.get_leading_area(middle) - self.get_leading_area(low)
+                total_area = self.get_leading_area(high) - self.get_leading_area(low)
+                rng = random.Random(f"{self.seed}:{low}:{high}")
+                self.range_splits[(low, high)] = hypergeometric_variate(
+                    rng, total_area, low_area, mine_count)
+            low_count = self.range_splits[(low, high)]
+            if chunk_number < middle:
+                high, mine_count = middle, low_count
+            else:
+                low, mine_count = middle, mine_count - low_count
+        return mine_count
+
+    def get_chunk_mines(self, chunk: tuple[int, int]) -> bytes:
+        """
+        Returns the mines of a chunk as a row-major bytearray where 1 is a mine,
+        generating them from the seed on first use
+
+        Chunks outside the board and chunks of a board without
+        mines share an empty chunk, placed mines are given as they are
+
+        :params tuple[int, int] chunk: chunk (x,y) coordinates
+        """
+        mines = self.placed_mines.get(chunk)
+        if mines is not None:
+            return mines
+        mines = self.chunk_mines.get(chunk)
+        if mines is not None:
+            return mines
+        if (not self.mines_placed
+                or not self.mines_from_seed
+                or not 0 <= chunk[0] < self.chunk_columns
+                or not 0 <= chunk[1] < self.chunk_rows):
+            return self.empty_chunk
+
+        x_origin, y_origin, width, height = self.get_chunk_bounds(chunk)
+        x_size = self.board_size[0]
+        candidates = [local_y * self.chunk_size + local_x
+                      for local_y in range(height)
+                      for local_x in range(width)
+                      if (y_origin + local_y) * x_size + x_origin + local_x not in self.safe_zone]
+        rng = random.Random(f"{self.seed}:chunk:{chunk[0]}:{chunk[1]}")
+        mines = bytearray(self.chunk_size * self.chunk_size)
+        for local_index in rng.sample(candidates, self.get_chunk_mine_count(chunk)):
+            mines[local_index] = 1
+        self.chunk_mines[chunk] = mines
+        return mines
+
+    def is_mine(self, tile: tuple[int, int]) -> bool:
+        """
+        Returns True if there is a mine on the given tile
+        Tiles outside of the board have no mines
+
+        :params tuple[int, int] tile: tile (x,y) index-coordinates
+        """
+        size = self.chunk_size
+        return bool(self.get_chunk_mines((tile[0] // size, tile[1] // size))
+                    [tile[1] % size * size + tile[0] % size])
+
+    def get_chunk_counts(self, chunk: tuple[int, int]) -> bytes:
+        """
+        Returns the neighbouring mine counts of the tiles of a chunk
+        as a row-major bytearray, computing them on first use
+
+        :params tuple[int, int] chunk: chunk (x,y) coordinates
+        """
+        counts = self.chunk_counts.get(chunk)
+        if counts is not None:
+            return counts
+        if not self.mines_placed:
+            return self.empty_chunk
+
+        # Rows of the chunk with a border of one tile from the neighbouring chunks
+        size = self.chunk_size
+        padded = []
+        for local_y in range(-1, size + 1):
+            row_chunk_y = chunk[1] + local_y // size
+            row_start = local_y % size * size
+            row = self.get_chunk_mines((chunk[0], row_chunk_y))[row_start:row_start + size]
+            padded.append(
+                (self.get_chunk_mines((chunk[0] - 1, row_chunk_y))[row_start + size - 1],
+                 *row,
+                 self.get_chunk_mines((chunk[0] + 1, row_chunk_y))[row_start]))
+
+        counts = bytearray(size * size)
+        for local_y in range(size):
+            above, row, below = padded[local_y], padded[local_y + 1], padded[local_y + 2]
+            row_start = local_y * size
+            for local_x in range(size):
+                counts[row_start + local_x] = (
+                    above[local_x] + above[local_x + 1] + above[local_x + 2]
+                    + row[local_x] + row[local_x + 2]
+                    + below[local_x] + below[local_x + 1] + below[local_x + 2])
+        self.chunk_counts[chunk] = counts
+        return counts
+
+    def find_chunk_states(self, chunk: tuple[int, int]) -> bytearray | None:
+        """
+        Returns the explored and flagged bits of the tiles of a chunk,
+        or None if no tile of the chunk has been explored or flagged
+
+        :params tuple[int, int] chunk: chunk (x,y) coordinates
+        """
+        return self.chunk_states.get(chunk)
+
+    def get_chunk_states(self, chunk: tuple[int, int]) -> bytearray:
+        """
+        Returns the explored and flagged bits of the tiles of a chunk,
+        creating them on first use
+
+        :params tuple[int, int] chunk: chunk (x,y) coordinates
+        """
+        states = self.find_chunk_states(chunk)
+        if states is None:
+            states = self.chunk_states[chunk] = bytearray(self.chunk_size * self.chunk_size)
+        return states
+
+    def get_tile_state(self, tile: tuple[int, int]) -> int:
+        """
+        Returns the explored and flagged bits of a tile
+
+        :params tuple[int, int] tile: tile (x,y) index-coordinates
+        """
+        size = self.chunk_size
+        states = self.find_chunk_states((tile[0] // size, tile[1] // size))
+        if states is None:
+            return 0
+        return states[tile[1] % size * size + tile[0] % size]
+
+    def set_tile_state(self, tile: tuple[int, int], state: int):
+        """
+        Sets the explored and flagged bits of a tile
+
+        :params tuple[int, int] tile: tile (x,y) index-coordinates
+        :params int state: new state bits
+        """
+        size = self.chunk_size
+        states = self.get_chunk_states((tile[0] // size, tile[1] // size))
+        states[tile[1] % size * size + tile[0] % size] = state
+
+    def mark_explored(self, tile: tuple[int, int]) -> bool:
+        """
+        Marks the given tile as explored
+
+        Returns True if the tile was not explored before
+
+        :params tuple[int, int] tile: tile (x,y) index-coordinates
+        """
+        state = self.get_tile_state(tile)
+        if state & TILE_EXPLORED:
+            return False
+        self.set_tile_state(tile, state | TILE_EXPLORED)
+        self.n_explored += 1
+        return True
+
+    def explore_tile(self, tile: tuple[(int, int)]) -> list[tuple[int, int]]:
+        """
+        Explores a tile on the board. If the tile has no surrounding mines
+        its opening is explored with a flood fill that crosses chunk
+        borders. If the tile is a mine, only the mine is marked as
+        explored and the game is lost
+
+        Places the mines around the first explored tile
+
+        Returns the tiles that were newly explored. The move is not
+        recorded and the journal and win are left to the caller
+
+        :params tuple[(int, int)] tile: tile on the board
+        """
+        if not self.mines_placed:
+            self.place_mines(tile)
+
+        newly_explored: list[tuple[int, int]] = []
+        if self.is_mine(tile):
+            if self.mark_explored(tile):
+                newly_explored.append(tile)
+            self.exploded_tile = tile
+            self.end_game(False)
+            return newly_explored
+
+        if self.mark_explored(tile):
+            newly_explored.append(tile)
+        if self.get_tile_content(tile) == '0':
+            self.explore_opening(tile, newly_explored)
+        return newly_explored
+
+    def explore_opening(self, tile: tuple[int, int], newly_explored: list[tuple[int, int]]):
+        """
+        Explores the opening around a tile without surrounding mines
+        with a flood fill that crosses chunk borders
+
+        The neighbours of a tile without surrounding mines cannot be
+        mines, so all of them are explored and the ones without
+        surrounding mines are explored further
+
+        The fill stops after `opening_limit` tiles, the tiles explored
+        last can then have unexplored neighbours that are safe to guess
+
+        :params tuple[int, int] tile: tile without surrounding mines
+        :params list[tuple[int, int]] newly_explored: list the explored tiles are added to
+        """
+        size = self.chunk_size
+        x_size, y_size = self.board_size
+        limit = len(newly_explored) + self.opening_limit if self.opening_limit else None
+        queue = deque([tile])
+        while queue and (limit is None or len(newly_explored) < limit):
+            x_index, y_index = queue.popleft()
+            for new_y in range(max(y_index - 1, 0), min(y_index + 2, y_size)):
+                chunk_y, local_y = divmod(new_y, size)
+                for new_x in range(max(x_index - 1, 0), min(x_index + 2, x_size)):
+                    chunk = (new_x // size, chunk_y)
+                    local_index = local_y * size + new_x % size
+                    states = self.get_chunk_states(chunk)
+                    if states[local_index] & TILE_EXPLORED:
+                        continue
+                    states[local_index] |= TILE_EXPLORED
+                    self.n_explored += 1
+                    newly_explored.append((new_x, new_y))
+                    if self.get_chunk_counts(chunk)[local_index] == 0:
+                        queue.append((new_x, new_y))
+
+    def get_tile_content(self, tile: tuple[(int, int)]) -> str:
+        """
+        Returns the contents of the tile given in (x,y) format
+        as a string
+
+        Raises an `IndexError` if invalid tile or outside game-board
+
+        :params tuple[(int, int)] tile: tile that content is stored in
+        """
+        if not self.is_on_board(tile):
+            raise IndexError
+        if tile == self.exploded_tile:
+            return 'X'
+        if self.is_mine(tile):
+            return 'x'
+        size = self.chunk_size
+        return str(self.get_chunk_counts((tile[0] // size, tile[1] // size))
+                   [tile[1] % size * size + tile[0] % size])
+
+    def set_tile_content(self, tile: tuple[(int, int)], content: str):
+        """
+        Sets the given string content into the given (x,y) position
+
+        'X' marks the exploded mine and 'x' places a mine. A number removes
+        the mine of the tile, the numbers of the tiles follow from the mines
+        around them
+
+        Raises an `IndexError` if invalid tile
+
+        :params tuple[(int, int)] tile: tile that content is stored in
+        :params str content: string content to be stored in tile
+        """
+        if not self.is_on_board(tile):
+            raise IndexError
+        if content == 'X':
+            self.exploded_tile = tile
+            return
+
+        size = self.chunk_size
+        chunk = (tile[0] // size, tile[1] // size)
+        mines = self.placed_mines.get(chunk)
+        if mines is None:
+            mines = self.placed_mines[chunk] = bytearray(self.get_chunk_mines(chunk))
+        mines[tile[1] % size * size + tile[0] % size] = content == 'x'
+        # The counts of the chunks around the tile are computed again
+        for chunk_y in range(chunk[1] - 1, chunk[1] + 2):
+            for chunk_x in range(chunk[0] - 1, chunk[0] + 2):
+                self.chunk_counts.pop((chunk_x, chunk_y), None)
+
+    def is_explored(self, tile: tuple[(int, int)]) -> bool:
+        """
+        Returns True if the given tile has been explored
+
+        :params tuple[(int, int)] tile: tile (x,y) index-coordinates
+        """
+        return bool(self.get_tile_state(tile) & TILE_EXPLORED)
+
+    def is_flagged(self, tile: tuple[(int, int)]) -> bool:
+        """
+        Returns True if the given tile has been flagged
+
+        :params tuple[(int, int)] tile: tile (x,y) index-coordinates
+        """
+        return bool(self.get_tile_state(tile) & TILE_FLAGGED)
+
+    def switch_flag(self, tile: tuple[(int, int)]) -> bool:
+        """
+        Removes the flag from a flagged tile or flags an unexplored tile
+        without recording the move or the change
+
+        Returns True if the flag changed, tiles outside the board cannot be flagged
+
+        :params tuple[(int, int)] tile: tile (x,y) index-coordinates
+        """
+        if not self.is_on_board(tile):
+            return False
+        state = self.get_tile_state(tile)
+        if state & TILE_FLAGGED:
+            self.set_tile_state(tile, state & ~TILE_FLAGGED)
+            self.n_flagged -= 1
+            return True
+        if not state & TILE_EXPLORED:
+            self.set_tile_state(tile, state | TILE_FLAGGED)
+            self.n_flagged += 1
+            return True
+        return False
+
+    @property
+    def explored_count(self) -> int:
+        """
+        Amount of explored tiles
+        """
+        return self.n_explored
+
+    @property
+    def flagged_count(self) -> int:
+        """
+        Amount of flagged tiles
+        """
+        return self.n_flagged
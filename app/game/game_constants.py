@@ -11,13 +11,53 @@ DIFFICULTY_MEDIUM = 2
 DIFFICULTY_HARD = 3
 DIFFICULTY_CUSTOM = 4
 
+# Share of board tiles that are mines on each preset difficulty
+DIFFICULTY_MINE_DENSITY = {
+    DIFFICULTY_EASY: 0.10,
+    DIFFICULTY_MEDIUM: 0.20,
+    DIFFICULTY_HARD: 0.30
+}
+
+# Bits of a random game seed, seeds fit into a signed 64-bit integer
+SEED_BITS = 63
+
+# Boards kept ready per (board size, mine count) for no-guess games
+NO_GUESS_POOL_CAPACITY = 4
+# Candidate boards a generator worker tries before giving up
+NO_GUESS_MAX_ATTEMPTS = 1000
+# Densest mine placement offered as no-guess boards, the solver
+# rarely wins denser boards without guessing
+NO_GUESS_MAX_MINE_DENSITY = 0.20
+
 GRAY_BG_RGBA = (192, 192, 192, 255)
 
+# Upper limit for how often the window is redrawn after game state changes
+MAX_FPS = 60
+
 GAME_BOARD_MIN_X_SIZE = 8
-GAME_BOARD_MAX_X_SIZE = 30
+GAME_BOARD_MAX_X_SIZE = 10000
 
 GAME_BOARD_MIN_Y_SIZE = 8
-GAME_BOARD_MAX_Y_SIZE = 30
+GAME_BOARD_MAX_Y_SIZE = 10000
+
+# Boards with a side longer than this are stored in chunks and drawn through a viewport
+CLASSIC_BOARD_MAX_SIZE = 30
+# Width and height of a board chunk in tiles
+BOARD_CHUNK_SIZE = 32
+
+# Tiles on each side of an endless board, the game starts in the middle
+INFINITE_BOARD_SIZE = 1 << 24
+# Generated chunks and unpacked tile states kept in memory on an endless board
+INFINITE_CHUNK_CACHE_SIZE = 256
+# Largest amount of tiles explored by one guess on an endless board
+INFINITE_OPENING_LIMIT = 100000
+
+# Largest window area used for the board, bigger boards are scrolled
+VIEWPORT_MAX_SIZE_PX = (1280, 768)
+# Zoom limits of the board view and the zoom change of one scroll step
+VIEWPORT_MIN_ZOOM = 0.25
+VIEWPORT_MAX_ZOOM = 1.0
+VIEWPORT_ZOOM_STEP = 1.25
 
 DIRECTIONS = [(-1, -1), (-1, 0), (-1, 1),
               ( 0, -1),          ( 0, 1),
@@ -1,15 +1,21 @@
 """
 Handler for starting the graphical game
 """
-from math import floor
 
 from app import scoreboard_logging
 from app import prompt_helpers
+from app.scoreboard_writer import ScoreboardWriter
 from app.sprite_helper import SpriteHelper
+from app.viewport import Viewport
 from app.lib import sweeperlib
 
-from .game_constants import TILE_SPRITE_SIZE_PX, STARTING_TIME, GRAY_BG_RGBA
+from .game_constants import (STARTING_TIME, GRAY_BG_RGBA, MAX_FPS,
+                             VIEWPORT_MAX_SIZE_PX, VIEWPORT_ZOOM_STEP)
 from .game_state import Game
+from .actions import ACTION_REVEAL, ACTION_TOGGLE_FLAG
+from .chunked_game_state import ChunkedGame
+from .infinite_game_state import InfiniteGame
+from .board_pool import BoardPool
 
 class GameHandler:
     """
@@ -20,6 +26,7 @@ class GameHandler:
     game_properties: dict
 
     game_state: Game
+    viewport: Viewport
     sprite_helper: SpriteHelper
 
     player_name: str
@@ -27,24 +34,71 @@ class GameHandler:
 
     turns_used: int
 
-    def __init__(self):
+    score_writer: ScoreboardWriter | None
+
+    def __init__(self,
+                 board_pool: BoardPool | None = None,
+                 score_writer: ScoreboardWriter | None = None):
         """
         Initializes the game properties and initializes game state.
 
         Asks user for input with `prompt_helpers.get_game_properties`
-        """
-        self.game_properties = prompt_helpers.get_game_properties()
 
-        self.game_state = Game(self.game_properties["board-size"],
-                               self.game_properties["mine-count"])
+        No-guess boards are taken from the given board pool and
+        start with the starting tile already explored
 
-        self.sprite_helper = SpriteHelper(self.game_state)
+        The score of the game is written by the given score writer or,
+        without one, directly when the game ends
+
+        :params BoardPool | None board_pool: pool of pregenerated no-guess boards
+        :params ScoreboardWriter | None score_writer: background writer of the score
+        """
+        self.game_properties = prompt_helpers.get_game_properties(board_pool)
+
+        board = None
+        if self.game_properties["no-guess"] and board_pool is not None:
+            board = board_pool.take(self.game_properties["board-size"],
+                                    self.game_properties["mine-count"])
+            if board is None:
+                print("Could not generate a board without guessing, "
+                      "using a random board instead")
+
+        if self.game_properties["endless"]:
+            self.game_state = InfiniteGame(self.game_properties["mine-density"])
+        elif self.game_properties["chunked"]:
+            self.game_state = ChunkedGame(self.game_properties["board-size"],
+                                          self.game_properties["mine-count"])
+        elif board is None:
+            self.game_state = Game(self.game_properties["board-size"],
+                                   self.game_properties["mine-count"])
+        else:
+            start_tile, seed = board
+            self.game_state = Game(self.game_properties["board-size"],
+                                   self.game_properties["mine-count"],
+                                   seed)
+            self.game_state.guess_tile(start_tile)
+
+        # Boards larger than the window are scrolled and zoomed through the viewport
+        board_size_px = self.game_properties["board-size-px"]
+        view_size_px = board_size_px
+        if self.game_properties["chunked"]:
+            view_size_px = (min(board_size_px[0], VIEWPORT_MAX_SIZE_PX[0]),
+                            min(board_size_px[1], VIEWPORT_MAX_SIZE_PX[1]))
+        self.viewport = Viewport(self.game_properties["board-size"], view_size_px)
+        if self.game_properties["endless"]:
+            board_size = self.game_properties["board-size"]
+            self.viewport.center_on((board_size[0] // 2, board_size[1] // 2))
+        self.sprite_helper = SpriteHelper(self.game_state,
+                                          self.viewport,
+                                          use_tilemap=self.game_properties["chunked"])
 
         self.player_name = self.game_properties["player-name"]
         self.difficulty = self.game_properties["difficulty"]
 
         self.turns_used: int = 0
 
+        self.score_writer = score_writer
+
     def start_game(self):
         """
         Creates the pyglet window and starts the event loop
@@ -52,17 +106,19 @@ class GameHandler:
         sweeperlib.load_sprites("resources/sprites")
 
         sweeperlib.create_window(
-                self.game_properties["board-size-px"][0],
-                self.game_properties["board-size-px"][1] + 128,
+                self.viewport.size_px[0],
+                self.viewport.size_px[1] + 128,
                 GRAY_BG_RGBA,
                 title="Mine Sweeper"
                 )
 
         # Set pyglet handlers
         sweeperlib.set_mouse_handler(self.handle_mouse)
+        sweeperlib.set_drag_handler(self.handle_drag)
+        sweeperlib.set_scroll_handler(self.handle_scroll)
         sweeperlib.set_interval_handler(self.update_timer, 1)
         sweeperlib.set_draw_handler(self.sprite_helper.draw_screen)
-        sweeperlib.start()
+        sweeperlib.start(MAX_FPS)
 
     def get_tile_pos_at_coordinates(self, position: tuple[(int, int)]) -> tuple[(int, int)]:
         """
@@ -73,26 +129,54 @@ class GameHandler:
 
         :params tuple[(int, int)] position: Mouse coordinates of the clicked window position
         """
-        x_index: int = floor(position[0] / TILE_SPRITE_SIZE_PX)
-        y_index: int = floor(position[1] / TILE_SPRITE_SIZE_PX)
-        return (x_index, y_index)
+        return self.viewport.screen_to_tile(position)
+
+    def handle_drag(self, _x_pos: int, _y_pos: int, d_x: int, d_y: int, m_button: int, _: int):
+        """
+        Pyglet drag handler that scrolls the board while the middle button is held
+
+        Set by `sweeperlib.set_drag_handler`
+
+        :params int d_x: Horizontal mouse movement since the last event
+        :params int d_y: Vertical mouse movement since the last event
+        :params int m_button: Pyglet mouse button that is held down
+        """
+        if m_button & sweeperlib.MOUSE_MIDDLE and self.viewport.scroll(d_x, d_y):
+            self.game_state.journal.record_view()
+            self.request_redraw()
+
+    def handle_scroll(self, x_pos: int, y_pos: int, _: int, scroll_y: int):
+        """
+        Pyglet mouse wheel handler that zooms the board at the mouse position
+
+        Set by `sweeperlib.set_scroll_handler`
+
+        :params int x_pos: Mouse x-position on the window
+        :params int y_pos: Mouse y-position on the window
+        :params int scroll_y: Steps the wheel was turned, positive zooms in
+        """
+        if self.viewport.zoom_at((x_pos, y_pos), VIEWPORT_ZOOM_STEP ** scroll_y):
+            self.game_state.journal.record_view()
+            self.request_redraw()
 
     def update_timer(self, _):
         """
         Decrements game_state.remaining_time by 1 on each iteration
+        with `Game.tick`
 
         Updates game_state.game_over if timer reaches 0
 
         Set by `sweeperlib.set_interval_handler`
         """
-        if self.game_state.remaining_time > 0:
-            if not self.game_state.game_over:
-                if not self.game_state.win:
-                    self.game_state.remaining_time -= 1
+        self.game_state.tick()
+        self.request_redraw()
 
-        if self.game_state.remaining_time <= 0:
-            # Player lost, game is over
-            self.game_state.game_over = True
+    def request_redraw(self):
+        """
+        Invalidates the window if the game state has changed since the last frame
+        """
+        if self.game_state.journal.has_changes:
+            sweeperlib.invalidate()
 
     def handle_mouse(self, x_pos: int, y_pos: int, m_button: int, _: int):
         """
@@ -104,48 +188,65 @@ class GameHandler:
         :params int y_pos: Mouse y-position on the window
         :params int m_button: Pyglet mouse button with which the window was clicked
         """
-        if self.game_state.game_over:
+        if self.game_state.game_over and self.game_properties["endless"]:
+            # Endless games have no tiles left to reveal to be ranked by,
+            # so they are kept off the scoreboard
+            tiles_explored = self.game_state.explored_count
+            if self.game_state.exploded_tile is not None:
+                tiles_explored -= 1
+            print(f"\nEndless game over, explored {tiles_explored} tiles in "
+                  f"{STARTING_TIME - self.game_state.remaining_time}s\n")
+            sweeperlib.close()
+            return
+        elif self.game_state.game_over:
             board_x_size = self.game_state.board_size[0]
             board_y_size = self.game_state.board_size[1]
             total_tiles = board_x_size * board_y_size
 
             mine_count = self.game_state.mine_count
-            tiles_explored = len(self.game_state.explored_tiles)
+            tiles_explored = self.game_state.explored_count
 
             left_to_explore = total_tiles - mine_count - tiles_explored
 
-            scoreboard_logging.write_scoreboard_data(
+            score_record = scoreboard_logging.make_score_record(
                 self.player_name,
                 self.difficulty,
                 self.turns_used,
                 STARTING_TIME - self.game_state.remaining_time,
                 left_to_explore,
-                self.game_state.board_size)
+                self.game_state.board_size,
+                self.game_state.mine_count,
+                self.game_state.seed,
+                self.game_state.move_log,
+                self.game_state.engine_name)
+
+            # Writing is left to the writer thread so that the click is not delayed
+            if self.score_writer is not None:
+                self.score_writer.submit(score_record)
+            else:
+                scoreboard_logging.append_records([score_record])
 
             sweeperlib.close()
-
-        max_board_x, max_board_y = self.game_state.board_size_px
-
-        # Check if click was outside of the board
-        if x_pos <= 0 or x_pos > max_board_x:
-            return
-        if y_pos <= 0 or y_pos > max_board_y:
             return
 
         # Get the approximate clicked tile
         selected_tile = self.get_tile_pos_at_coordinates((x_pos, y_pos))
 
+        # Check if click was outside of the drawn board
+        if not self.viewport.is_visible(selected_tile):
+            return
+
         # Match the mouse button with an action
+        actions = []
         match m_button:
             case sweeperlib.MOUSE_LEFT:
                 # Cannot guess a flagged tile
-                if selected_tile not in self.game_state.flagged_tiles:
+                if not self.game_state.is_flagged(selected_tile):
                     self.turns_used += 1
-                    self.game_state.guess_tile(selected_tile)
+                    actions.append((ACTION_REVEAL, selected_tile))
 
             case sweeperlib.MOUSE_RIGHT:
-                if selected_tile in self.game_state.flagged_tiles:
-                    self.game_state.flagged_tiles.remove(selected_tile)
+                actions.append((ACTION_TOGGLE_FLAG, selected_tile))
 
-                elif selected_tile not in self.game_state.explored_tiles:
-                    self.game_state.flagged_tiles.append(selected_tile)
+        self.game_state.apply_actions(actions)
+        self.request_redraw()
@@ -7,7 +7,15 @@ Includes methods to manipulate state and act game logic
 """
 
 import random
-from .game_constants import TILE_SPRITE_SIZE_PX, DIRECTIONS, STARTING_TIME
+from collections.abc import Iterable
+
+from .game_constants import TILE_SPRITE_SIZE_PX, DIRECTIONS, STARTING_TIME, SEED_BITS
+from .move_log import append_move, MOVE_REVEAL, MOVE_FLAG
+from .actions import (Action, ActionDelta, ACTION_REVEAL, ACTION_TOGGLE_FLAG,
+                      ACTION_FLAG, ACTION_UNFLAG, ACTION_CHORD)
+from .tile_index import TileIndex
+from .openings import label_openings
+from .change_journal import ChangeJournal
 
 class Game:
     """
@@ -15,27 +23,37 @@ class Game:
 
     Includes methods for game logic
     """
-    explored_tiles: list[tuple[int, int]]
-    flagged_tiles: list[tuple[int, int]]
+    # Name of the board engine stored in score records for replays
+    engine_name = "list"
+    tile_index: TileIndex
+    opening_ids: list[int]
+    openings: list[list[int]]
     mine_count: int
+    mines_placed: bool
     turns_used: int
     remaining_time: int
     game_over: bool
     win: bool
     board_size: tuple[int, int]
     board_size_px: tuple[int, int]
+    journal: ChangeJournal
+    seed: int
+    rng: random.Random
+    move_log: bytearray
 
-    def __init__(self, board_size: tuple[int, int], mine_count: int):
+    def __init__(self, board_size: tuple[int, int], mine_count: int, seed: int | None = None):
         """
         Initialize the object attributes
-        Places `n_mines` amount of mines randomly on the `game_board`
+        `mine_count` amount of mines are placed randomly on the first guess
+
+        Games with the same seed and moves end up in the same state,
+        moves are recorded into `move_log`
 
         :params int board_size: board size in (x-size, y-size) format
-        :params int n_mines: number of mines to be placed
+        :params int mine_count: number of mines to be placed
+        :params int | None seed: seed of the mine placement, random if None
         """
         # Init instance attributes
-        self.explored_tiles: list[tuple[int, int]] = []
-        self.flagged_tiles: list[tuple[int, int]] = []
         self.mine_count: int = mine_count
         self.turns_used: int = 0
         self.remaining_time: int = STARTING_TIME
@@ -44,31 +62,94 @@ class Game:
         self.board_size = board_size
         self.board_size_px = (self.board_size[0] * TILE_SPRITE_SIZE_PX,
                               self.board_size[1] * TILE_SPRITE_SIZE_PX)
+        self.journal = ChangeJournal()
+        self.seed = random.getrandbits(SEED_BITS) if seed is None else seed
+        self.rng = random.Random(self.seed)
+        self.move_log = bytearray()
+
+        self.init_board()
+
+    def init_board(self):
+        """
+        Builds an empty game board
+
+        Mines are placed by `place_mines` on the first guess so that
+        the first guessed tile and its surroundings are always safe
+
+        Alternative board engines override this together with `set_mines`
+        and the tile accessors to use a different board representation
+        """
+        self.tile_index = TileIndex(self.board_size)
+        self.mines_placed = False
+        self.opening_ids = [-1] * (self.board_size[0] * self.board_size[1])
+        self.openings = []
 
         # Initialize board
         self.game_board: list[list[str]]  = []
         for _ in range(self.board_size[1]):
             row: list[str] = []
             for _ in range(self.board_size[0]):
-                row.append(' ')
+                row.append('0')
             self.game_board.append(row)
 
-        # Initialize mines on the game board
-        allocated_mines: list[tuple[(int, int)]] = []
-        while len(allocated_mines) < mine_count:
-            rand_y = random.randint(0, self.board_size[1] - 1)
-            rand_x = random.randint(0, self.board_size[0] - 1)
-            if (rand_x, rand_y) not in allocated_mines:
-                self.set_tile_content((rand_x, rand_y), 'x')
-                allocated_mines.append((rand_x, rand_y))
-
-        # Sets the tile contents for each `game_tile` according to
-        # the amount of surrounding mines each has
-        for y_index in range(self.board_size[1]):
-            for x_index in range(self.board_size[0]):
-                if self.get_tile_content((x_index, y_index)) != 'x':
-                    surrounding_mines_n = self.count_tile_surroundings((x_index, y_index))
-                    self.set_tile_content((x_index, y_index), str(surrounding_mines_n))
+    def get_safe_zone(self, safe_tile: tuple[(int, int)]) -> set[int]:
+        """
+        Returns the flat indices (y * x-size + x) of the given tile
+        and its surrounding tiles
+
+        :params tuple[(int, int)] safe_tile: tile (x,y) index-coordinates
+        """
+        x_size, y_size = self.board_size
+        return {new_y * x_size + new_x
+                for new_y in range(max(safe_tile[1] - 1, 0), min(safe_tile[1] + 2, y_size))
+                for new_x in range(max(safe_tile[0] - 1, 0), min(safe_tile[0] + 2, x_size))}
+
+    def place_mines(self, safe_tile: tuple[(int, int)] | None = None):
+        """
+        Places `mine_count` mines randomly on the game board by sampling
+        tiles without replacement
+
+        The safe tile and its surroundings are kept free of mines.
+        If there are too many mines for that, only the safe tile is kept free
+
+        :params tuple[(int, int)] | None safe_tile: tile to keep free of mines
+        """
+        total_tiles = self.board_size[0] * self.board_size[1]
+        safe_zone: set[int] = set()
+        if safe_tile is not None:
+            safe_zone = self.get_safe_zone(safe_tile)
+            if total_tiles - len(safe_zone) < self.mine_count:
+                safe_zone = {safe_tile[1] * self.board_size[0] + safe_tile[0]}
+
+        candidates = [index for index in range(total_tiles) if index not in safe_zone]
+        self.set_mines(self.rng.sample(candidates, self.mine_count))
+
+    def set_mines(self, mine_indices: list[int]):
+        """
+        Places mines on the given tiles, sets the tile contents according
+        to the amount of surrounding mines and labels the board openings
+
+        :params list[int] mine_indices: flat indices (y * x-size + x) of the mines
+        """
+        x_size, y_size = self.board_size
+
+        # Every mine increments the counts of its surroundings
+        counts: list[int] = [0] * (x_size * y_size)
+        for index in mine_indices:
+            x_index, y_index = index % x_size, index // x_size
+            for new_y in range(max(y_index - 1, 0), min(y_index + 2, y_size)):
+                for new_x in range(max(x_index - 1, 0), min(x_index + 2, x_size)):
+                    counts[new_y * x_size + new_x] += 1
+        for index in mine_indices:
+            counts[index] = -1
+
+        for y_index, row in enumerate(self.game_board):
+            for x_index in range(x_size):
+                count = counts[y_index * x_size + x_index]
+                row[x_index] = 'x' if count == -1 else str(count)
+
+        self.opening_ids, self.openings = label_openings(counts, self.board_size)
+        self.mines_placed = True
 
     def count_tile_surroundings(self, tile: tuple[(int, int)]) -> int:
         """
@@ -95,58 +176,141 @@ class Game:
                 pass
         return count
 
-    def guess_tile(self, tile: tuple[(int, int)]) -> None:
+    def guess_tile(self, tile: tuple[(int, int)]) -> list[tuple[int, int]]:
         """
-        Updates the game board according to floodfill logic by
-        adding visited tiles into the `explored_fields` attribute
-        if the clicked tile is a mine, only the mine is marked
-        as explored
+        Explores the guessed tile with `explore_tile` and records the move
+
+        Returns the tiles that were newly explored by the guess
 
         As a side effect updates game_state.win according to game state
 
-        :params tuple[(int, int)] tile: starting tile for guess algorithm
+        :params tuple[(int, int)] tile: guessed tile
         """
-        # Check if the given tile is within boundaries
-        try:
-            self.get_tile_content(tile)
-        except IndexError:
-            return
+        if not self.is_on_board(tile):
+            return []
+        append_move(self.move_log, tile[1] * self.board_size[0] + tile[0], MOVE_REVEAL)
+        newly_explored = self.explore_tile(tile)
+        self.journal.record_tiles(newly_explored)
+        if not self.game_over:
+            self.update_win()
+        return newly_explored
+
+    def explore_tile(self, tile: tuple[(int, int)]) -> list[tuple[int, int]]:
+        """
+        Explores a tile on the board. If the tile has no surrounding mines
+        its whole precomputed opening is explored. If the tile is a mine,
+        only the mine is marked as explored and the game is lost
+
+        Places the mines around the first explored tile
 
-        if self.get_tile_content(tile) == 'x':
-            self.explored_tiles.append(tile)
+        Returns the tiles that were newly explored. The move is not
+        recorded and the journal and win are left to the caller
+
+        :params tuple[(int, int)] tile: tile on the board
+        """
+        if not self.mines_placed:
+            self.place_mines(tile)
+
+        newly_explored: list[tuple[int, int]] = []
+        tile_content = self.get_tile_content(tile)
+        if tile_content == 'x':
+            if self.tile_index.mark_explored(tile):
+                newly_explored.append(tile)
             # 'X' is the exploded marker for a tile
             self.set_tile_content(tile, 'X')
-            self.game_over = True
-            return
+            self.end_game(False)
+            return newly_explored
+
+        x_size = self.board_size[0]
+        opening_id = self.opening_ids[tile[1] * x_size + tile[0]]
+        if opening_id == -1:
+            if self.tile_index.mark_explored(tile):
+                newly_explored.append(tile)
+        else:
+            for index in self.openings[opening_id]:
+                opening_tile = (index % x_size, index // x_size)
+                if self.tile_index.mark_explored(opening_tile):
+                    newly_explored.append(opening_tile)
+        return newly_explored
 
-        to_explore: list[tuple[(int, int)]] = [tile]
-        while len(to_explore) > 0:
-            tile_to_explore = to_explore.pop()
-
-            if tile_to_explore not in self.explored_tiles:
-                self.explored_tiles.append(tile_to_explore)
-
-            surrounding_tiles: list[tuple[(int, int)]] = []
-            no_surrounding_mines = True
-            # Add surroundings into to_explore if unexplored
-            for dir_x, dir_y in DIRECTIONS:
-                new_x = tile_to_explore[0] + dir_x
-                new_y = tile_to_explore[1] + dir_y
-                try:
-                    # Check if a neighbor is a mine
-                    if self.get_tile_content((new_x, new_y)) == 'x':
-                        no_surrounding_mines = False
-                        break
-                    # Check if the neighbor hasn't been explored
-                    if (new_x, new_y) not in self.explored_tiles:
-                        surrounding_tiles.append((new_x, new_y))
-                except IndexError:
-                    # New tile was outside
-                    # Ignore tile
-                    pass
-            if no_surrounding_mines:
-                to_explore.extend(surrounding_tiles)
-        self.update_win()
+    def apply_actions(self, actions: Iterable[Action]) -> ActionDelta:
+        """
+        Applies a batch of (action, tile) actions and records their moves
+
+        - `ACTION_REVEAL` explores an unexplored tile like `guess_tile`
+        - `ACTION_TOGGLE_FLAG` toggles a flag like `toggle_flag`
+        - `ACTION_FLAG` and `ACTION_UNFLAG` set and remove a flag
+        - `ACTION_CHORD` explores the unflagged surroundings of an explored
+          number whose surroundings have as many flags as the number
+
+        Actions that would change nothing are skipped, like the single
+        tile methods the actions are applied also after the game is over.
+        The win is checked after every explored tile like in `guess_tile`,
+        so a batch ends in the same state as its moves applied one at
+        a time. The journal is updated once after the whole batch
+
+        Returns the aggregate changes of the batch
+
+        :params Iterable[Action] actions: (action, tile) tuples to be applied
+        """
+        delta = ActionDelta()
+        x_size, y_size = self.board_size
+        move_log = self.move_log
+        for action, tile in actions:
+            x_index, y_index = tile
+            if not (0 <= x_index < x_size and 0 <= y_index < y_size):
+                continue
+
+            if action == ACTION_REVEAL:
+                if self.is_explored(tile):
+                    continue
+                delta.turns += 1
+                append_move(move_log, y_index * x_size + x_index, MOVE_REVEAL)
+                delta.explored.extend(self.explore_tile(tile))
+                if not self.game_over:
+                    self.update_win()
+
+            elif action in (ACTION_TOGGLE_FLAG, ACTION_FLAG, ACTION_UNFLAG):
+                flagged = self.is_flagged(tile)
+                if action == ACTION_FLAG and flagged or action == ACTION_UNFLAG and not flagged:
+                    continue
+                if self.switch_flag(tile):
+                    append_move(move_log, y_index * x_size + x_index, MOVE_FLAG)
+                    (delta.unflagged if flagged else delta.flagged).append(tile)
+
+            elif action == ACTION_CHORD:
+                if not self.is_explored(tile):
+                    continue
+                tile_content = self.get_tile_content(tile)
+                neighbours = [(x_index + dir_x, y_index + dir_y) for dir_x, dir_y in DIRECTIONS
+                              if 0 <= x_index + dir_x < x_size and 0 <= y_index + dir_y < y_size]
+                if (not tile_content.isdigit()
+                        or sum(self.is_flagged(neighbour) for neighbour in neighbours)
+                        != int(tile_content)):
+                    continue
+                delta.turns += 1
+                # Chords are recorded as the reveals they make
+                for neighbour in neighbours:
+                    if not self.is_explored(neighbour) and not self.is_flagged(neighbour):
+                        append_move(move_log, neighbour[1] * x_size + neighbour[0], MOVE_REVEAL)
+                        delta.explored.extend(self.explore_tile(neighbour))
+                        if not self.game_over:
+                            self.update_win()
+
+        self.journal.record_tiles(delta.explored)
+        if delta.flagged or delta.unflagged:
+            self.journal.record_tiles(delta.flagged + delta.unflagged)
+            self.journal.mine_counter = True
+        delta.game_over, delta.win = self.game_over, self.win
+        return delta
+
+    def is_on_board(self, tile: tuple[(int, int)]) -> bool:
+        """
+        Returns True if the given tile is within the board
+
+        :params tuple[(int, int)] tile: tile (x,y) index-coordinates
+        """
+        return 0 <= tile[0] < self.board_size[0] and 0 <= tile[1] < self.board_size[1]
 
     def get_tile_content(self, tile: tuple[(int, int)]) -> str:
         """
@@ -183,11 +347,92 @@ class Game:
         #        "is outside of game board")
         raise IndexError
 
+    def is_explored(self, tile: tuple[(int, int)]) -> bool:
+        """
+        Returns True if the given tile has been explored,
+        tiles outside the board are never explored
+
+        :params tuple[(int, int)] tile: tile (x,y) index-coordinates
+        """
+        return self.is_on_board(tile) and self.tile_index.is_explored(tile)
+
+    def is_flagged(self, tile: tuple[(int, int)]) -> bool:
+        """
+        Returns True if the given tile has been flagged,
+        tiles outside the board are never flagged
+
+        :params tuple[(int, int)] tile: tile (x,y) index-coordinates
+        """
+        return self.is_on_board(tile) and self.tile_index.is_flagged(tile)
+
+    def toggle_flag(self, tile: tuple[(int, int)]):
+        """
+        Removes the flag from a flagged tile or flags an unexplored tile
+        with `switch_flag` and records the move
+        Explored tiles cannot be flagged
+
+        :params tuple[(int, int)] tile: tile (x,y) index-coordinates
+        """
+        if not self.is_on_board(tile):
+            return
+        append_move(self.move_log, tile[1] * self.board_size[0] + tile[0], MOVE_FLAG)
+        if self.switch_flag(tile):
+            self.journal.record_flag(tile)
+
+    def switch_flag(self, tile: tuple[(int, int)]) -> bool:
+        """
+        Removes the flag from a flagged tile or flags an unexplored tile
+        without recording the move or the change
+
+        Returns True if the flag changed, tiles outside the board cannot be flagged
+
+        :params tuple[(int, int)] tile: tile (x,y) index-coordinates
+        """
+        return self.is_on_board(tile) and self.tile_index.toggle_flag(tile)
+
+    @property
+    def explored_count(self) -> int:
+        """
+        Amount of explored tiles
+        """
+        return self.tile_index.explored_count
+
+    @property
+    def flagged_count(self) -> int:
+        """
+        Amount of flagged tiles
+        """
+        return self.tile_index.flagged_count
+
     def update_win(self):
         """
         Updates the win and game_over attribute according to
         the amount of explored tiles
         """
         target_explored_tile_count = self.board_size[0] * self.board_size[1] - self.mine_count
-        if len(self.explored_tiles) == target_explored_tile_count:
-            self.win, self.game_over = True, True
+        if self.explored_count == target_explored_tile_count:
+            self.end_game(True)
+
+    def end_game(self, win: bool):
+        """
+        Sets the game over and records the transition in the journal
+
+        :params bool win: True if the game was won
+        """
+        if self.game_over:
+            return
+        self.win, self.game_over = win, True
+        self.journal.record_status()
+
+    def tick(self):
+        """
+        Decrements `remaining_time` by 1 while the game is running
+        and ends the game when the timer reaches 0
+        """
+        if self.remaining_time > 0 and not self.game_over:
+            self.remaining_time -= 1
+            self.journal.timer = True
+
+        if self.remaining_time <= 0:
+            # Player lost, game is over
+            self.end_game(False)
@@ -0,0 +1,164 @@
+"""
+Module that includes the game-object of endless boards
+
+An endless board is a chunked board so large that it cannot be explored
+to its edges. Instead of splitting a fixed mine count between the chunks,
+every chunk draws its mines from a hash of the seed and its coordinates,
+so chunks are independent and generated only when a guess reaches them.
+
+Generated chunks are kept in bounded caches and regenerated when needed
+again. Tile states are the only data that cannot be regenerated, the
+states of chunks that drop out of the cache are stored zlib-compressed
+and chunks without any explored or flagged tile are not stored at all.
+"""
+
+import random
+import zlib
+from collections import OrderedDict
+
+from .chunked_game_state import ChunkedGame
+from .game_constants import (BOARD_CHUNK_SIZE, INFINITE_BOARD_SIZE,
+                             INFINITE_CHUNK_CACHE_SIZE, INFINITE_OPENING_LIMIT)
+
+class InfiniteGame(ChunkedGame):
+    """
+    Endless game whose chunks are generated independently from the seed
+
+    The board is `INFINITE_BOARD_SIZE` tiles on each side and cannot be won,
+    the game ends when a mine is guessed or the time runs out
+    """
+    engine_name = "endless"
+    mine_density: float
+    cache_size: int
+    chunk_mines: OrderedDict[tuple[int, int], bytearray]
+    chunk_counts: OrderedDict[tuple[int, int], bytearray]
+    chunk_states: OrderedDict[tuple[int, int], bytearray]
+    packed_states: dict[tuple[int, int], bytes]
+    opening_limit = INFINITE_OPENING_LIMIT
+
+    def __init__(self,
+                 mine_density: float,
+                 seed: int | None = None,
+                 chunk_size: int = BOARD_CHUNK_SIZE,
+                 cache_size: int = INFINITE_CHUNK_CACHE_SIZE):
+        """
+        Initialize the object attributes
+
+        `mine_count` is the expected amount of mines on the whole board
+
+        :params float mine_density: share of tiles that are mines
+        :params int | None seed: seed of the mine placement, random if None
+        :params int chunk_size: width and height of a chunk in tiles
+        :params int cache_size: generated chunks kept in memory, at least 9
+        """
+        self.mine_density = mine_density
+        self.cache_size = max(cache_size, 9)
+        super().__init__((INFINITE_BOARD_SIZE, INFINITE_BOARD_SIZE),
+                         round(INFINITE_BOARD_SIZE * INFINITE_BOARD_SIZE * mine_density),
+                         seed,
+                         chunk_size)
+
+    def init_board(self):
+        """
+        Builds an empty board with bounded chunk caches
+        """
+        super().init_board()
+        self.chunk_mines = OrderedDict()
+        self.chunk_counts = OrderedDict()
+        self.chunk_states = OrderedDict()
+        self.packed_states = {}
+
+    def get_chunk_mine_count(self, chunk: tuple[int, int]) -> int:
+        """
+        Returns the amount of mines in a chunk as a binomial draw seeded
+        by the chunk, tiles in the safe zone are left out of the draw
+
+        :params tuple[int, int] chunk: chunk (x,y) coordinates
+        """
+        x_origin, y_origin, width, height = self.get_chunk_bounds(chunk)
+        x_size = self.board_size[0]
+        safe_tiles = sum(1 for index in self.safe_zone
+                         if x_origin <= index % x_size < x_origin + width
+                         and y_origin <= index // x_size < y_origin + height)
+        rng = random.Random(f"{self.seed}:count:{chunk[0]}:{chunk[1]}")
+        return rng.binomialvariate(width * height - safe_tiles, self.mine_density)
+
+    def cache_chunk(self, cache: OrderedDict, chunk: tuple[int, int]):
+        """
+        Marks a chunk of a cache as the most recently used one
+        and drops the least recently used chunks over the cache size
+
+        :params OrderedDict cache: `chunk_mines` or `chunk_counts`
+        :params tuple[int, int] chunk: chunk (x,y) coordinates
+        """
+        if chunk in cache:
+            cache.move_to_end(chunk)
+            while len(cache) > self.cache_size:
+                cache.popitem(last=False)
+
+    def get_chunk_mines(self, chunk: tuple[int, int]) -> bytes:
+        """
+        Returns the mines of a chunk, generating them again
+        if the chunk has been dropped from the cache
+
+        :params tuple[int, int] chunk: chunk (x,y) coordinates
+        """
+        mines = super().get_chunk_mines(chunk)
+        self.cache_chunk(self.chunk_mines, chunk)
+        return mines
+
+    def get_chunk_counts(self, chunk: tuple[int, int]) -> bytes:
+        """
+        Returns the neighbouring mine counts of a chunk, computing
+        them again if the chunk has been dropped from the cache
+
+        :params tuple[int, int] chunk: chunk (x,y) coordinates
+        """
+        counts = super().get_chunk_counts(chunk)
+        self.cache_chunk(self.chunk_counts, chunk)
+        return counts
+
+    def find_chunk_states(self, chunk: tuple[int, int]) -> bytearray | None:
+        """
+        Returns the explored and flagged bits of the tiles of a chunk,
+        unpacking them if the chunk has been dropped from the cache
+
+        Returns None if no tile of the chunk has been explored or flagged
+
+        :params tuple[int, int] chunk: chunk (x,y) coordinates
+        """
+        states = self.chunk_states.get(chunk)
+        if states is None:
+            packed = self.packed_states.pop(chunk, None)
+            if packed is None:
+                return None
+            states = self.chunk_states[chunk] = bytearray(zlib.decompress(packed))
+        self.chunk_states.move_to_end(chunk)
+        self.pack_states()
+        return states
+
+    def get_chunk_states(self, chunk: tuple[int, int]) -> bytearray:
+        """
+        Returns the explored and flagged bits of the tiles of a chunk,
+        creating them on first use
+
+        :params tuple[int, int] chunk: chunk (x,y) coordinates
+        """
+        states = super().get_chunk_states(chunk)
+        self.pack_states()
+        return states
+
+    def pack_states(self):
+        """
+        Compresses the tile states of the least recently used chunks
+        over the cache size, chunks without any state are forgotten
+        """
+        while len(self.chunk_states) > self.cache_size:
+            chunk, states = self.chunk_states.popitem(last=False)
+            if any(states):
+                self.packed_states[chunk] = zlib.compress(states)
+
+    def update_win(self):
+        """
+        An endless board cannot be won
+        """
@@ -0,0 +1,64 @@
+"""
+Compact binary log of the moves of a game
+
+Every move is stored as a single unsigned LEB128 varint of
+(flat tile index << 2 | action), so a move on a board of up to
+8192 tiles takes at most two bytes. Together with the seed of the
+game the log is enough to replay the game from the start.
+"""
+
+import base64
+from collections.abc import Iterator
+
+MOVE_REVEAL = 0
+MOVE_FLAG = 1
+
+MOVE_ACTION_BITS = 2
+MOVE_ACTION_MASK = (1 << MOVE_ACTION_BITS) - 1
+
+def append_move(move_log: bytearray, tile_index: int, action: int):
+    """
+    Appends a move into the log
+
+    :params bytearray move_log: log of the game
+    :params int tile_index: flat index (y * x-size + x) of the tile
+    :params int action: `MOVE_REVEAL` or `MOVE_FLAG`
+    """
+    value = tile_index << MOVE_ACTION_BITS | action
+    while value >= 0x80:
+        move_log.append(value & 0x7f | 0x80)
+        value >>= 7
+    move_log.append(value)
+
+def iter_moves(move_log: bytes) -> Iterator[tuple[int, int]]:
+    """
+    Yields the moves of a log as (flat tile index, action) tuples
+
+    :params bytes move_log: log of the game
+    """
+    value = 0
+    shift = 0
+    for byte in move_log:
+        value |= (byte & 0x7f) << shift
+        if byte & 0x80:
+            shift += 7
+            continue
+        yield value >> MOVE_ACTION_BITS, value & MOVE_ACTION_MASK
+        value = 0
+        shift = 0
+
+def encode_move_log(move_log: bytes) -> str:
+    """
+    Returns the log as base64 text for JSON records
+
+    :params bytes move_log: log of the game
+    """
+    return base64.b64encode(move_log).decode("ascii")
+
+def decode_move_log(text: str) -> bytes:
+    """
+    Returns the log of base64 text created with `encode_move_log`
+
+    :params str text: base64 text of the log
+    """
+    return base64.b64decode(text)
@@ -0,0 +1,231 @@
+"""
+Module that includes the NumPy-backed game-object
+
+Stores the mines, neighbour counts and reveal/flag state of the
+board as compact arrays indexed with [y, x] and computes the
+neighbour counts with one vectorized neighbourhood sum
+
+Requires NumPy
+"""
+
+import numpy as np # pylint: disable=import-error
+
+from .game_state import Game
+from .openings import label_openings
+
+# Neighbour count value used for mines in `NumpyGame.counts`
+MINE_COUNT_VALUE = -1
+
+class NumpyGame(Game):
+    """
+    Alternative board engine for large boards
+
+    Keeps the public interface of `Game` so it can be used
+    with `SpriteHelper` and `GameHandler`
+    """
+    engine_name = "numpy"
+    mines: np.ndarray
+    counts: np.ndarray
+    explored: np.ndarray
+    flagged: np.ndarray
+    n_explored: int
+    n_flagged: int
+    exploded_tile: tuple[int, int] | None
+    openings: list[np.ndarray]
+
+    def init_board(self):
+        """
+        Builds empty board arrays
+
+        Mines are placed by `place_mines` on the first guess
+        """
+        x_size, y_size = self.board_size
+
+        self.explored = np.zeros((y_size, x_size), dtype=bool)
+        self.flagged = np.zeros((y_size, x_size), dtype=bool)
+        self.n_explored = 0
+        self.n_flagged = 0
+        self.exploded_tile = None
+
+        self.mines = np.zeros((y_size, x_size), dtype=bool)
+        self.counts = np.zeros((y_size, x_size), dtype=np.int8)
+        self.mines_placed = False
+        self.opening_ids = [-1] * (x_size * y_size)
+        self.openings = []
+
+    def set_mines(self, mine_indices: list[int]):
+        """
+        Places mines on the given tiles, computes the neighbour counts
+        of every tile in one pass and labels the board openings
+
+        :params list[int] mine_indices: flat indices (y * x-size + x) of the mines
+        """
+        x_size, y_size = self.board_size
+
+        self.mines[:] = False
+        self.mines.flat[mine_indices] = True
+
+        # Sum the eight shifted views of the zero-padded mine array
+        padded = np.pad(self.mines.astype(np.int8), 1)
+        self.counts = np.zeros((y_size, x_size), dtype=np.int8)
+        for dir_x, dir_y in self.neighbour_offsets():
+            self.counts += padded[1 + dir_y:1 + dir_y + y_size,
+                                  1 + dir_x:1 + dir_x + x_size]
+        self.counts[self.mines] = MINE_COUNT_VALUE
+
+        self.opening_ids, openings = label_openings(self.counts.ravel().tolist(),
+                                                    self.board_size)
+        self.openings = [np.array(opening, dtype=np.intp) for opening in openings]
+        self.mines_placed = True
+
+    @staticmethod
+    def neighbour_offsets() -> list[tuple[int, int]]:
+        """
+        Returns the (x,y) offsets of the eight neighbouring tiles
+        """
+        return [(dir_x, dir_y)
+                for dir_y in (-1, 0, 1)
+                for dir_x in (-1, 0, 1)
+                if (dir_x, dir_y) != (0, 0)]
+
+    def count_tile_surroundings(self, tile: tuple[(int, int)]) -> int:
+        """
+        Returns the amount of mines around the given tile.
+        If the given tile is outside of the board, returns 0
+
+        :params tuple[(int, int)] tile: tile (x,y) index-coordinates of the target tile
+        """
+        if not self.is_on_board(tile):
+            return 0
+        x_index, y_index = tile
+        neighbourhood = self.mines[max(y_index - 1, 0):y_index + 2,
+                                   max(x_index - 1, 0):x_index + 2]
+        return int(np.count_nonzero(neighbourhood)) - int(self.mines[y_index, x_index])
+
+    def explore_tile(self, tile: tuple[(int, int)]) -> list[tuple[int, int]]:
+        """
+        Explores a tile on the board. If the tile has no surrounding mines
+        its whole precomputed opening is explored with one array update.
+        If the tile is a mine, only the mine is marked as explored and
+        the game is lost
+
+        Places the mines around the first explored tile
+
+        Returns the tiles that were newly explored. The move is not
+        recorded and the journal and win are left to the caller
+
+        :params tuple[(int, int)] tile: tile on the board
+        """
+        if not self.mines_placed:
+            self.place_mines(tile)
+
+        x_size = self.board_size[0]
+        tile_index = tile[1] * x_size + tile[0]
+        if self.mines[tile[1], tile[0]]:
+            self.exploded_tile = tile
+
+        opening_id = self.opening_ids[tile_index]
+        if opening_id == -1:
+            indices = np.array([tile_index], dtype=np.intp)
+        else:
+            indices = self.openings[opening_id]
+
+        explored_flat = self.explored.reshape(-1)
+        new_indices = indices[~explored_flat[indices]]
+        explored_flat[new_indices] = True
+        self.n_explored += len(new_indices)
+
+        newly_explored = [(index % x_size, index // x_size) for index in new_indices.tolist()]
+        if self.exploded_tile == tile:
+            self.end_game(False)
+        return newly_explored
+
+    def get_tile_content(self, tile: tuple[(int, int)]) -> str:
+        """
+        Returns the contents of the tile given in (x,y) format
+        as a string using the same markers as `Game`
+
+        Raises an `IndexError` if invalid tile or outside game-board
+
+        :params tuple[(int, int)] tile: tile that content is stored in
+        """
+        if not self.is_on_board(tile):
+            raise IndexError
+        if tile == self.exploded_tile:
+            return 'X'
+        count = int(self.counts[tile[1], tile[0]])
+        if count == MINE_COUNT_VALUE:
+            return 'x'
+        return str(count)
+
+    def set_tile_content(self, tile: tuple[(int, int)], content: str):
+        """
+        Sets the given string content into the given (x,y) position
+
+        Raises an `IndexError` if invalid tile
+
+        :params tuple[(int, int)] tile: tile that content is stored in
+        :params str content: string content to be stored in tile
+        """
+        if not self.is_on_board(tile):
+            raise IndexError
+        x_index, y_index = tile
+        if content == 'X':
+            self.exploded_tile = tile
+            return
+        self.mines[y_index, x_index] = content == 'x'
+        self.counts[y_index, x_index] = MINE_COUNT_VALUE if content == 'x' else int(content)
+
+    def is_explored(self, tile: tuple[(int, int)]) -> bool:
+        """
+        Returns True if the given tile has been explored,
+        tiles outside the board are never explored
+
+        :params tuple[(int, int)] tile: tile (x,y) index-coordinates
+        """
+        return self.is_on_board(tile) and bool(self.explored[tile[1], tile[0]])
+
+    def is_flagged(self, tile: tuple[(int, int)]) -> bool:
+        """
+        Returns True if the given tile has been flagged,
+        tiles outside the board are never flagged
+
+        :params tuple[(int, int)] tile: tile (x,y) index-coordinates
+        """
+        return self.is_on_board(tile) and bool(self.flagged[tile[1], tile[0]])
+
+    def switch_flag(self, tile: tuple[(int, int)]) -> bool:
+        """
+        Removes the flag from a flagged tile or flags an unexplored tile
+        without recording the move or the change
+
+        Returns True if the flag changed, tiles outside the board cannot be flagged
+
+        :params tuple[(int, int)] tile: tile (x,y) index-coordinates
+        """
+        if not self.is_on_board(tile):
+            return False
+        x_index, y_index = tile
+        if self.flagged[y_index, x_index]:
+            self.flagged[y_index, x_index] = False
+            self.n_flagged -= 1
+            return True
+        if not self.explored[y_index, x_index]:
+            self.flagged[y_index, x_index] = True
+            self.n_flagged += 1
+            return True
+        return False
+
+    @property
+    def explored_count(self) -> int:
+        """
+        Amount of explored tiles
+        """
+        return self.n_explored
+
+    @property
+    def flagged_count(self) -> int:
+        """
+        Amount of flagged tiles
+        """
+        return self.n_flagged
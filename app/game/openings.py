@@ -0,0 +1,57 @@
+"""
+Module for labelling the openings of a game board
+
+An opening is a connected region of tiles without surrounding mines
+together with the numbered tiles bordering it. Clicking any tile of
+the region reveals the whole opening.
+"""
+
+def label_openings(counts: list[int], board_size: tuple[int, int]
+                   ) -> tuple[list[int], list[list[int]]]:
+    """
+    Labels every opening of the board with a single breadth-first pass
+
+    Tiles are given and returned as flat indices (y * x-size + x)
+
+    Returns a tuple of:
+    - opening index of every tile, -1 for tiles outside of a zero-region
+    - flat indices of the tiles of each opening, region tiles first and
+      bordering tiles after them, each tile listed once
+
+    :params list[int] counts: surrounding mine count of every tile, mines negative
+    :params tuple[int, int] board_size: board size in (x-size, y-size) format
+    """
+    x_size, y_size = board_size
+    opening_ids: list[int] = [-1] * len(counts)
+    # Latest opening that a bordering tile was added to
+    border_marks: list[int] = [-1] * len(counts)
+    openings: list[list[int]] = []
+
+    for start_index, start_count in enumerate(counts):
+        if start_count != 0 or opening_ids[start_index] != -1:
+            continue
+
+        opening_id = len(openings)
+        opening_ids[start_index] = opening_id
+        region: list[int] = [start_index]
+        border: list[int] = []
+
+        position = 0
+        while position < len(region):
+            index = region[position]
+            position += 1
+            x_index, y_index = index % x_size, index // x_size
+            for new_y in range(max(y_index - 1, 0), min(y_index + 2, y_size)):
+                for new_x in range(max(x_index - 1, 0), min(x_index + 2, x_size)):
+                    new_index = new_y * x_size + new_x
+                    if counts[new_index] == 0:
+                        if opening_ids[new_index] == -1:
+                            opening_ids[new_index] = opening_id
+                            region.append(new_index)
+                    elif border_marks[new_index] != opening_id:
+                        border_marks[new_index] = opening_id
+                        border.append(new_index)
+
+        openings.append(region + border)
+
+    return opening_ids, openings
@@ -0,0 +1,120 @@
+"""
+Replay of recorded games
+
+A game is reproduced from its board size, mine count, seed and move
+log on the board engine that played it, since the engines place their
+mines differently. The moves are decoded once, after which the state
+after any amount of moves is rebuilt by applying the moves on a new game.
+"""
+
+from collections.abc import Iterator
+
+from .game_state import Game
+from .chunked_game_state import ChunkedGame
+from .game_constants import CLASSIC_BOARD_MAX_SIZE
+from .move_log import iter_moves, decode_move_log
+
+# Board engines of score records by their `engine_name`
+REPLAY_ENGINES: dict[str, type[Game]] = {
+    Game.engine_name: Game,
+    ChunkedGame.engine_name: ChunkedGame
+}
+
+class Replay:
+    """
+    Decoded recording of a game
+    """
+    board_size: tuple[int, int]
+    mine_count: int
+    seed: int
+    moves: list[tuple[tuple[int, int], int]]
+    engine: type[Game]
+
+    def __init__(self,
+                 board_size: tuple[int, int],
+                 mine_count: int,
+                 seed: int,
+                 move_log: bytes,
+                 engine: type[Game] = Game):
+        """
+        Decodes the move log of a game
+
+        :params tuple[int, int] board_size: board size in (x-size, y-size) format
+        :params int mine_count: number of mines on the board
+        :params int seed: seed of the recorded game
+        :params bytes move_log: move log of the recorded game
+        :params type[Game] engine: board engine used for the replayed games
+        """
+        self.board_size = board_size
+        self.mine_count = mine_count
+        self.seed = seed
+        self.engine = engine
+        x_size = board_size[0]
+        self.moves = [((tile_index % x_size, tile_index // x_size), action)
+                      for tile_index, action in iter_moves(move_log)]
+
+    @classmethod
+    def from_record(cls, record: dict, engine: type[Game] | None = None) -> "Replay | None":
+        """
+        Returns the replay of a scoreboard record, or None if the record
+        was written without a seed and a move log or by an engine that
+        cannot be replayed
+
+        The engine is taken from the record. Records written before the
+        engine was stored are chunked if a side of the board is longer
+        than `CLASSIC_BOARD_MAX_SIZE`, like the games that wrote them
+
+        :params dict record: scoreboard record
+        :params type[Game] | None engine: board engine used for the replayed games,
+                                          the engine of the record if None
+        """
+        if record.get("seed") is None or record.get("moves") is None:
+            return None
+        if engine is None:
+            engine_name = record.get("engine")
+            if engine_name is None:
+                engine_name = (ChunkedGame.engine_name
+                               if max(record["game_size_x"], record["game_size_y"])
+                               > CLASSIC_BOARD_MAX_SIZE
+                               else Game.engine_name)
+            engine = REPLAY_ENGINES.get(engine_name)
+            if engine is None:
+                return None
+        return cls((record["game_size_x"], record["game_size_y"]),
+                   record["mine_count"],
+                   record["seed"],
+                   decode_move_log(record["moves"]),
+                   engine)
+
+    def apply_moves(self, game: Game, start: int, stop: int):
+        """
+        Applies the moves from `start` up to `stop` on the game
+        as one batch of actions, moves have the same values
+        as `ACTION_REVEAL` and `ACTION_TOGGLE_FLAG`
+
+        :params Game game: game whose first `start` moves have been applied
+        :params int start: index of the first applied move
+        :params int stop: index after the last applied move
+        """
+        game.apply_actions((action, tile) for tile, action in self.moves[start:stop])
+
+    def state_at(self, move_count: int | None = None) -> Game:
+        """
+        Returns a new game with the first `move_count` moves applied
+
+        :params int | None move_count: amount of applied moves, all if None
+        """
+        game = self.engine(self.board_size, self.mine_count, self.seed)
+        self.apply_moves(game, 0, len(self.moves) if move_count is None else move_count)
+        return game
+
+    def states(self) -> Iterator[Game]:
+        """
+        Yields the same game after each move, starting
+        from the state before the first move
+        """
+        game = self.engine(self.board_size, self.mine_count, self.seed)
+        yield game
+        for move_index in range(len(self.moves)):
+            self.apply_moves(game, move_index, move_index + 1)
+            yield game
@@ -0,0 +1,431 @@
+"""
+Constraint-propagation solver for the game-object
+
+Deduces safe tiles and certain mines from the revealed numbers
+and plays the game automatically
+
+Every revealed number is a constraint: the sum of its unknown
+surrounding tiles equals its number minus its known mines.
+The solver applies single-point rules first, then subset rules between
+overlapping constraints, then linear reasoning over the frontier, and
+only guesses when nothing can be deduced.
+
+Constraints are updated incrementally from the tiles each guess reveals
+"""
+
+import random
+from math import gcd
+
+from .game_state import Game
+from .game_constants import DIRECTIONS
+from .actions import ACTION_REVEAL
+
+class Constraint:
+    """
+    The unknown tiles around a revealed number and
+    the amount of mines among them
+    """
+    unknowns: set[tuple[int, int]]
+    mines: int
+
+    def __init__(self, unknowns: set[tuple[int, int]], mines: int):
+        """
+        :params set[tuple[int, int]] unknowns: unknown tiles around the number
+        :params int mines: amount of mines among the unknown tiles
+        """
+        self.unknowns = unknowns
+        self.mines = mines
+
+class Solver:
+    """
+    Automatic player for a `Game`
+
+    Guesses have to be made through `Solver.guess_tile` or
+    `Solver.reveal_safe_tiles` so that the solver sees the tiles
+    each guess reveals
+    """
+    game: Game
+    rng: random.Random | None
+    safe_tiles: set[tuple[int, int]]
+    mine_tiles: set[tuple[int, int]]
+    constraints: dict[tuple[int, int], Constraint]
+    tile_constraints: dict[tuple[int, int], set[tuple[int, int]]]
+    dirty: set[tuple[int, int]]
+    guesses: int
+
+    def __init__(self, game: Game, rng: random.Random | None = None):
+        """
+        Initializes a solver with no knowledge of the board
+
+        :params Game game: game to be solved
+        :params random.Random | None rng: generator for breaking ties between
+                                          equally good guesses, None for deterministic play
+        """
+        self.game = game
+        self.rng = rng
+        self.safe_tiles = set()
+        self.mine_tiles = set()
+        # Constraints are keyed with the tile of their number
+        self.constraints = {}
+        # Keys of the constraints each unknown tile belongs to
+        self.tile_constraints = {}
+        self.dirty = set()
+        self.guesses = 0
+
+    def neighbours(self, tile: tuple[int, int]) -> list[tuple[int, int]]:
+        """
+        Returns the surrounding tiles of the given tile that are on the board
+
+        :params tuple[int, int] tile: tile (x,y) index-coordinates
+        """
+        return [(tile[0] + dir_x, tile[1] + dir_y)
+                for dir_x, dir_y in DIRECTIONS
+                if self.game.is_on_board((tile[0] + dir_x, tile[1] + dir_y))]
+
+    def guess_tile(self, tile: tuple[int, int]) -> list[tuple[int, int]]:
+        """
+        Guesses the given tile on the game and updates the constraints
+        affected by the newly explored tiles
+
+        Returns the newly explored tiles
+
+        :params tuple[int, int] tile: tile to be guessed
+        """
+        newly_explored = self.game.guess_tile(tile)
+        self.observe(newly_explored)
+        return newly_explored
+
+    def reveal_safe_tiles(self) -> list[tuple[int, int]]:
+        """
+        Reveals all known safe tiles as one batch of actions and
+        updates the constraints affected by the newly explored tiles
+
+        Returns the newly explored tiles
+        """
+        delta = self.game.apply_actions([(ACTION_REVEAL, tile) for tile in self.safe_tiles])
+        self.observe(delta.explored)
+        return delta.explored
+
+    def observe(self, newly_explored: list[tuple[int, int]]):
+        """
+        Removes newly explored tiles from their constraints and adds
+        the constraints of newly explored numbers
+
+        :params list[tuple[int, int]] newly_explored: tiles explored by the latest guess
+        """
+        for tile in newly_explored:
+            self.safe_tiles.discard(tile)
+            self.remove_unknown(tile, 0)
+
+        for tile in newly_explored:
+            tile_content = self.game.get_tile_content(tile)
+            if tile_content in ('x', 'X', '0'):
+                # Empty tiles have their surroundings explored with them
+                continue
+
+            unknowns: set[tuple[int, int]] = set()
+            mines = int(tile_content)
+            for neighbour in self.neighbours(tile):
+                if neighbour in self.mine_tiles:
+                    mines -= 1
+                elif not self.game.is_explored(neighbour) and neighbour not in self.safe_tiles:
+                    unknowns.add(neighbour)
+
+            if unknowns:
+                self.constraints[tile] = Constraint(unknowns, mines)
+                for unknown in unknowns:
+                    self.tile_constraints.setdefault(unknown, set()).add(tile)
+                self.dirty.add(tile)
+
+    def remove_unknown(self, tile: tuple[int, int], mines: int):
+        """
+        Removes a tile whose content is known from every constraint it belongs to
+
+        :params tuple[int, int] tile: tile (x,y) index-coordinates
+        :params int mines: 1 if the tile is a mine, otherwise 0
+        """
+        for key in self.tile_constraints.pop(tile, ()):
+            constraint = self.constraints[key]
+            constraint.unknowns.discard(tile)
+            constraint.mines -= mines
+            self.dirty.add(key)
+
+    def mark_safe(self, tile: tuple[int, int]):
+        """
+        Marks a tile as certainly safe
+
+        :params tuple[int, int] tile: tile (x,y) index-coordinates
+        """
+        if tile in self.safe_tiles or self.game.is_explored(tile):
+            return
+        self.safe_tiles.add(tile)
+        self.remove_unknown(tile, 0)
+
+    def mark_mine(self, tile: tuple[int, int]):
+        """
+        Marks a tile as certainly a mine
+
+        :params tuple[int, int] tile: tile (x,y) index-coordinates
+        """
+        if tile in self.mine_tiles:
+            return
+        self.mine_tiles.add(tile)
+        self.remove_unknown(tile, 1)
+
+    def resolve(self, tiles: set[tuple[int, int]], mines: int) -> bool:
+        """
+        Applies the single-point rules to a set of tiles containing
+        the given amount of mines
+
+        Returns True if the tiles were all safe or all mines
+
+        :params set[tuple[int, int]] tiles: unknown tiles
+        :params int mines: amount of mines among the tiles
+        """
+        if mines == 0:
+            for tile in list(tiles):
+                self.mark_safe(tile)
+            return True
+        if mines == len(tiles):
+            for tile in list(tiles):
+                self.mark_mine(tile)
+            return True
+        return False
+
+    def propagate(self):
+        """
+        Applies the single-point and subset rules to the changed
+        constraints until nothing more can be deduced from them
+        """
+        while self.dirty:
+            key = self.dirty.pop()
+            constraint = self.constraints.get(key)
+            if constraint is None:
+                continue
+            if not constraint.unknowns:
+                del self.constraints[key]
+                continue
+            if self.resolve(constraint.unknowns, constraint.mines):
+                continue
+
+            # Subset rule with the overlapping constraints
+            overlapping: set[tuple[int, int]] = set()
+            for unknown in constraint.unknowns:
+                overlapping |= self.tile_constraints.get(unknown, set())
+            overlapping.discard(key)
+            for other_key in overlapping:
+                other = self.constraints.get(other_key)
+                if other is None:
+                    continue
+                if constraint.unknowns < other.unknowns:
+                    self.resolve(other.unknowns - constraint.unknowns,
+                                 other.mines - constraint.mines)
+                elif other.unknowns < constraint.unknowns:
+                    self.resolve(constraint.unknowns - other.unknowns,
+                                 constraint.mines - other.mines)
+                if key not in self.constraints or not constraint.unknowns:
+                    break
+
+    def frontier_components(self) -> list[list[tuple[int, int]]]:
+        """
+        Splits the constraints into groups connected by shared unknown tiles
+
+        Returns the constraint keys of each group
+        """
+        components: list[list[tuple[int, int]]] = []
+        visited: set[tuple[int, int]] = set()
+        for start_key, start_constraint in self.constraints.items():
+            if start_key in visited or not start_constraint.unknowns:
+                continue
+            visited.add(start_key)
+            component = [start_key]
+            position = 0
+            while position < len(component):
+                constraint = self.constraints[component[position]]
+                position += 1
+                for unknown in constraint.unknowns:
+                    for other_key in self.tile_constraints[unknown]:
+                        if other_key not in visited:
+                            visited.add(other_key)
+                            component.append(other_key)
+            components.append(component)
+        return components
+
+    def solve_linear(self) -> bool:
+        """
+        Reduces the constraints of each frontier component into row echelon
+        form and deduces the tiles whose value follows from a single reduced row
+
+        For a row `sum(a * x) = b` with tiles x being 0 or 1: if b equals
+        the sum of the positive coefficients, the tiles with positive
+        coefficients are mines and the others safe, and vice versa for
+        the sum of the negative coefficients
+
+        Returns True if anything was deduced
+        """
+        components = self.frontier_components()
+        # With no unknown tiles off the frontier the remaining mine count
+        # gives one more constraint, which joins all components together
+        with_mine_count = len(self.tile_constraints) == self.count_unknown_tiles()
+        if with_mine_count and len(components) > 1:
+            components = [[key for component in components for key in component]]
+
+        deduced = False
+        for component in components:
+            frontier = sorted({tile for key in component
+                               for tile in self.constraints[key].unknowns})
+            columns = {tile: column for column, tile in enumerate(frontier)}
+            rows: list[list[int]] = []
+            for key in component:
+                row = [0] * (len(frontier) + 1)
+                for tile in self.constraints[key].unknowns:
+                    row[columns[tile]] = 1
+                row[-1] = self.constraints[key].mines
+                rows.append(row)
+            if with_mine_count:
+                rows.append([1] * len(frontier) + [self.game.mine_count - len(self.mine_tiles)])
+
+            for row in self.eliminate(rows, len(frontier)):
+                positive = sum(value for value in row[:-1] if value > 0)
+                negative = sum(value for value in row[:-1] if value < 0)
+                if positive == negative == 0:
+                    continue
+                if row[-1] not in (positive, negative):
+                    continue
+                mines_positive = row[-1] == positive
+                for column, value in enumerate(row[:-1]):
+                    if value == 0:
+                        continue
+                    if (value > 0) == mines_positive:
+                        self.mark_mine(frontier[column])
+                    else:
+                        self.mark_safe(frontier[column])
+                    deduced = True
+        return deduced
+
+    @staticmethod
+    def eliminate(rows: list[list[int]], column_count: int) -> list[list[int]]:
+        """
+        Integer Gauss-Jordan elimination of the given augmented rows
+
+        Rows are kept integral by cross-multiplying and dividing
+        by the greatest common divisor of each reduced row
+
+        :params list[list[int]] rows: rows of coefficients followed by the constant
+        :params int column_count: amount of coefficient columns
+        """
+        pivot_row = 0
+        for column in range(column_count):
+            for row_index in range(pivot_row, len(rows)):
+                if rows[row_index][column] != 0:
+                    break
+            else:
+                continue
+            rows[pivot_row], rows[row_index] = rows[row_index], rows[pivot_row]
+            pivot = rows[pivot_row]
+            for other_index, other in enumerate(rows):
+                if other_index == pivot_row or other[column] == 0:
+                    continue
+                factor, pivot_factor = other[column], pivot[column]
+                reduced = [pivot_factor * value - factor * pivot_value
+                           for value, pivot_value in zip(other, pivot)]
+                divisor = 0
+                for value in reduced:
+                    divisor = gcd(divisor, value)
+                if divisor > 1:
+                    reduced = [value // divisor for value in reduced]
+                rows[other_index] = reduced
+            pivot_row += 1
+        return rows
+
+    def count_unknown_tiles(self) -> int:
+        """
+        Returns the amount of unexplored tiles that are not known mines or known safe
+        """
+        total_tiles = self.game.board_size[0] * self.game.board_size[1]
+        return (total_tiles - self.game.explored_count
+                - len(self.mine_tiles) - len(self.safe_tiles))
+
+    def deduce(self) -> bool:
+        """
+        Runs the deduction rules until a safe tile is found
+        or nothing more can be deduced
+
+        Returns True if there is a known safe tile to guess
+        """
+        self.propagate()
+        while not self.safe_tiles and self.solve_linear():
+            self.propagate()
+        return len(self.safe_tiles) > 0
+
+    def best_guess(self) -> tuple[int, int]:
+        """
+        Returns the unknown tile least likely to be a mine
+
+        Frontier tiles are estimated with the highest mine ratio of their
+        constraints, other tiles with the ratio of remaining mines to
+        unknown tiles
+        """
+        unknown_count = self.count_unknown_tiles()
+        remaining_mines = self.game.mine_count - len(self.mine_tiles)
+        default_risk = remaining_mines / unknown_count if unknown_count else 1.0
+
+        best_risk = 2.0
+        best_tiles: list[tuple[int, int]] = []
+        for y_index in range(self.game.board_size[1]):
+            for x_index in range(self.game.board_size[0]):
+                tile = (x_index, y_index)
+                if self.game.is_explored(tile) or tile in self.mine_tiles:
+                    continue
+                risk = default_risk
+                if tile in self.tile_constraints:
+                    risk = max(self.constraints[key].mines / len(self.constraints[key].unknowns)
+                               for key in self.tile_constraints[tile])
+                if risk < best_risk:
+                    best_risk, best_tiles = risk, [tile]
+                elif risk == best_risk:
+                    best_tiles.append(tile)
+
+        if self.rng is None:
+            return best_tiles[0]
+        return self.rng.choice(best_tiles)
+
+    def next_move(self) -> tuple[int, int]:
+        """
+        Returns the next tile to guess
+
+        Known safe tiles are guessed first, the first guess is made
+        in the middle of the board
+        """
+        if not self.game.mines_placed:
+            return (self.game.board_size[0] // 2, self.game.board_size[1] // 2)
+        if self.safe_tiles or self.deduce():
+            return next(iter(self.safe_tiles))
+        self.guesses += 1
+        return self.best_guess()
+
+    def play_turn(self) -> list[tuple[int, int]]:
+        """
+        Plays one turn of the game
+
+        Returns the newly explored tiles
+        """
+        return self.guess_tile(self.next_move())
+
+    def play(self, allow_guessing: bool = True) -> bool:
+        """
+        Plays the game until it is over
+
+        Returns True if the game was won
+
+        :params bool allow_guessing: if False, stops when nothing can be deduced
+        """
+        while not self.game.game_over:
+            if self.game.mines_placed and not allow_guessing:
+                if not self.safe_tiles and not self.deduce():
+                    return False
+            if self.safe_tiles:
+                self.reveal_safe_tiles()
+            else:
+                self.play_turn()
+        return self.game.win
@@ -0,0 +1,83 @@
+"""
+Module that includes the tile-state index
+
+The tile-state index stores the explored and flagged state of
+every tile in a bitmap and keeps running counters of both
+"""
+
+TILE_EXPLORED = 1
+TILE_FLAGGED = 2
+
+class TileIndex:
+    """
+    Bitmap of per-tile states with running counters
+
+    Membership checks, updates and counts are all O(1)
+    Tiles are expected to be within the board
+    """
+    x_size: int
+    states: bytearray
+    explored_count: int
+    flagged_count: int
+
+    def __init__(self, board_size: tuple[int, int]):
+        """
+        Initializes an index where every tile is unexplored and unflagged
+
+        :params tuple[int, int] board_size: board size in (x-size, y-size) format
+        """
+        self.x_size = board_size[0]
+        self.states = bytearray(board_size[0] * board_size[1])
+        self.explored_count = 0
+        self.flagged_count = 0
+
+    def is_explored(self, tile: tuple[(int, int)]) -> bool:
+        """
+        Returns True if the given tile has been explored
+
+        :params tuple[(int, int)] tile: tile (x,y) index-coordinates
+        """
+        return bool(self.states[tile[1] * self.x_size + tile[0]] & TILE_EXPLORED)
+
+    def is_flagged(self, tile: tuple[(int, int)]) -> bool:
+        """
+        Returns True if the given tile has been flagged
+
+        :params tuple[(int, int)] tile: tile (x,y) index-coordinates
+        """
+        return bool(self.states[tile[1] * self.x_size + tile[0]] & TILE_FLAGGED)
+
+    def mark_explored(self, tile: tuple[(int, int)]) -> bool:
+        """
+        Marks the given tile as explored
+
+        Returns True if the tile was not explored before
+
+        :params tuple[(int, int)] tile: tile (x,y) index-coordinates
+        """
+        index = tile[1] * self.x_size + tile[0]
+        if self.states[index] & TILE_EXPLORED:
+            return False
+        self.states[index] |= TILE_EXPLORED
+        self.explored_count += 1
+        return True
+
+    def toggle_flag(self, tile: tuple[(int, int)]) -> bool:
+        """
+        Removes the flag from a flagged tile or flags an unexplored tile
+        Explored tiles cannot be flagged
+
+        Returns True if the flag was toggled
+
+        :params tuple[(int, int)] tile: tile (x,y) index-coordinates
+        """
+        index = tile[1] * self.x_size + tile[0]
+        if self.states[index] & TILE_FLAGGED:
+            self.states[index] &= ~TILE_FLAGGED
+            self.flagged_count -= 1
+            return True
+        if not self.states[index] & TILE_EXPLORED:
+            self.states[index] |= TILE_FLAGGED
+            self.flagged_count += 1
+            return True
+        return False
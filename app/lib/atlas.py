@@ -0,0 +1,117 @@
+"""
+atlas - packs the game sprites into a single texture atlas
+
+The atlas is a single PNG image with a JSON manifest that gives the
+region of every sprite key. Loading the atlas opens one file and gives
+every sprite the same texture, so the sprites can be drawn together.
+
+Rebuild the atlas after changing any of the sprite images:
+
+    $ python -m app.lib.atlas resources/sprites
+"""
+
+import json
+import os
+import sys
+
+from app.lib.png import read_png, write_png
+
+ATLAS_IMAGE = "atlas.png"
+ATLAS_MANIFEST = "atlas.json"
+
+# Empty pixels around each sprite so that neighbouring sprites never bleed into each other
+ATLAS_PADDING = 2
+ATLAS_MAX_WIDTH = 1024
+
+# Sprite keys used by sweeperlib and the image files they are loaded from
+SPRITE_FILES = {
+    '0': "tiles/tile_empty.png",
+    **{str(i): f"tiles/tile_{i}.png" for i in range(1, 9)},
+    'x': "tiles/tile_mine.png",
+    ' ': "tiles/tile_back.png",
+    'f': "tiles/tile_flag.png",
+    'X': "tiles/tile_mine_explode.png",
+    'F': "tiles/tile_mine_incorrect.png",
+    "face-smiley": "faces/face-smiley.png",
+    "face-lose": "faces/face-lose.png",
+    "face-win": "faces/face-win.png",
+    **{f"display-{i}": f"display/display-{i}.png" for i in range(0, 10)},
+    "display-empty": "display/display-empty.png",
+    "display--": "display/display-line.png",
+    "end-plate": "end_plate.png"
+}
+
+def pack_regions(sizes: dict[str, tuple[int, int]],
+                 max_width: int = ATLAS_MAX_WIDTH,
+                 padding: int = ATLAS_PADDING
+                 ) -> tuple[dict[str, tuple[int, int]], tuple[int, int]]:
+    """
+    Packs rectangles into rows (shelves) from the tallest to the lowest
+
+    Returns a tuple of (top-left corner of each rectangle, atlas size)
+
+    :param dict sizes: (width, height) of each key
+    :param int max_width: maximum width of the atlas
+    :param int padding: empty pixels between the rectangles
+    """
+
+    positions = {}
+    shelf_x = shelf_y = shelf_height = atlas_width = 0
+    for key in sorted(sizes, key=lambda key: (-sizes[key][1], key)):
+        width, height = sizes[key]
+        if shelf_x > 0 and shelf_x + width + padding > max_width:
+            shelf_y += shelf_height
+            shelf_x = shelf_height = 0
+        positions[key] = (shelf_x + padding, shelf_y + padding)
+        shelf_x += width + padding
+        shelf_height = max(shelf_height, height + padding)
+        atlas_width = max(atlas_width, shelf_x + padding)
+    return positions, (atlas_width, shelf_y + shelf_height + padding)
+
+def build_atlas(path: str):
+    """
+    Packs the sprite images in the given directory into
+    the atlas image and writes its manifest next to it
+
+    Regions in the manifest are given as [x, y, width, height]
+    with y measured from the bottom of the atlas like in pyglet
+
+    :param str path: sprite directory
+    """
+
+    images = {key: read_png(os.path.join(path, file_name))
+              for key, file_name in SPRITE_FILES.items()}
+    positions, (atlas_width, atlas_height) = pack_regions(
+        {key: (width, height) for key, (width, height, _) in images.items()})
+
+    pixels = bytearray(atlas_width * atlas_height * 4)
+    regions = {}
+    for key, (width, height, sprite_pixels) in images.items():
+        x_position, y_position = positions[key]
+        for row in range(height):
+            start = ((y_position + row) * atlas_width + x_position) * 4
+            pixels[start:start + width * 4] = sprite_pixels[row * width * 4:(row + 1) * width * 4]
+        regions[key] = [x_position, atlas_height - y_position - height, width, height]
+
+    write_png(os.path.join(path, ATLAS_IMAGE), atlas_width, atlas_height, pixels)
+    with open(os.path.join(path, ATLAS_MANIFEST), "w", encoding="utf-8") as manifest_file:
+        json.dump({"image": ATLAS_IMAGE, "size": [atlas_width, atlas_height], "regions": regions},
+                  manifest_file, indent=4)
+
+def read_manifest(path: str) -> dict | None:
+    """
+    Reads the atlas manifest of the given sprite directory
+
+    Returns None if the directory has no atlas
+
+    :param str path: sprite directory
+    """
+
+    try:
+        with open(os.path.join(path, ATLAS_MANIFEST), "r", encoding="utf-8") as manifest_file:
+            return json.load(manifest_file)
+    except FileNotFoundError:
+        return None
+
+if __name__ == "__main__":
+    build_atlas(sys.argv[1] if len(sys.argv) > 1 else "resources/sprites")
@@ -0,0 +1,184 @@
+"""
+png - minimal PNG reader and writer without external dependencies
+
+Supports non-interlaced 8-bit grayscale, RGB, palette and RGBA images,
+which covers the sprites of the game. Pixels are handled as RGBA bytes
+in rows from the top of the image to the bottom.
+"""
+
+import struct
+import zlib
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# Bytes per pixel of each supported PNG color type
+COLOR_TYPE_CHANNELS = {
+    0: 1, # grayscale
+    2: 3, # RGB
+    3: 1, # palette
+    4: 2, # grayscale and alpha
+    6: 4  # RGBA
+}
+
+def unfilter_rows(raw: bytes, width: int, height: int, channels: int) -> bytearray:
+    """
+    Reverses the per-row PNG filters of decompressed image data
+
+    :param bytes raw: decompressed image data, each row starting with its filter type
+    :param int width: image width in pixels
+    :param int height: image height in pixels
+    :param int channels: bytes per pixel
+    """
+
+    stride = width * channels
+    pixels = bytearray(stride * height)
+    previous = bytearray(stride)
+    for row_index in range(height):
+        start = row_index * (stride + 1)
+        filter_type = raw[start]
+        row = bytearray(raw[start + 1:start + 1 + stride])
+        if filter_type == 1:
+            for i in range(channels, stride):
+                row[i] = (row[i] + row[i - channels]) & 0xff
+        elif filter_type == 2:
+            for i in range(stride):
+                row[i] = (row[i] + previous[i]) & 0xff
+        elif filter_type == 3:
+            for i in range(stride):
+                left = row[i - channels] if i >= channels else 0
+                row[i] = (row[i] + ((left + previous[i]) >> 1)) & 0xff
+        elif filter_type == 4:
+            for i in range(stride):
+                left = row[i - channels] if i >= channels else 0
+                upper_left = previous[i - channels] if i >= channels else 0
+                estimate = left + previous[i] - upper_left
+                distance_left = abs(estimate - left)
+                distance_up = abs(estimate - previous[i])
+                distance_upper_left = abs(estimate - upper_left)
+                if distance_left <= distance_up and distance_left <= distance_upper_left:
+                    predictor = left
+                elif distance_up <= distance_upper_left:
+                    predictor = previous[i]
+                else:
+                    predictor = upper_left
+                row[i] = (row[i] + predictor) & 0xff
+        elif filter_type != 0:
+            raise ValueError(f"Unknown PNG filter type {filter_type}")
+        pixels[row_index * stride:(row_index + 1) * stride] = row
+        previous = row
+    return pixels
+
+def read_png(path: str) -> tuple[int, int, bytearray]:
+    """
+    Reads a PNG image
+
+    Returns a tuple of (width, height, RGBA pixel bytes)
+
+    :param str path: path of the PNG file
+    """
+
+    with open(path, "rb") as png_file:
+        data = png_file.read()
+    if not data.startswith(PNG_SIGNATURE):
+        raise ValueError(f"{path} is not a PNG file")
+
+    palette = b""
+    transparency = b""
+    compressed: list[bytes] = []
+    position = len(PNG_SIGNATURE)
+    while position < len(data):
+        length, chunk_type = struct.unpack(">I4s", data[position:position + 8])
+        chunk = data[position + 8:position + 8 + length]
+        position += length + 12
+        if chunk_type == b"IHDR":
+            width, height, bit_depth, color_type, _, _, interlace = struct.unpack(">IIBBBBB", chunk)
+        elif chunk_type == b"PLTE":
+            palette = chunk
+        elif chunk_type == b"tRNS":
+            transparency = chunk
+        elif chunk_type == b"IDAT":
+            compressed.append(chunk)
+        elif chunk_type == b"IEND":
+            break
+
+    if bit_depth != 8 or interlace != 0 or color_type not in COLOR_TYPE_CHANNELS:
+        raise ValueError(f"{path} is not a non-interlaced 8-bit PNG image")
+
+    channels = COLOR_TYPE_CHANNELS[color_type]
+    pixels = unfilter_rows(zlib.decompress(b"".join(compressed)), width, height, channels)
+
+    if color_type == 6:
+        return width, height, pixels
+
+    rgba = bytearray(width * height * 4)
+    if color_type == 2:
+        for channel in range(3):
+            rgba[channel::4] = pixels[channel::3]
+        rgba[3::4] = b"\xff" * (width * height)
+    elif color_type == 4:
+        for channel in range(3):
+            rgba[channel::4] = pixels[0::2]
+        rgba[3::4] = pixels[1::2]
+    elif color_type == 0:
+        for channel in range(3):
+            rgba[channel::4] = pixels
+        rgba[3::4] = b"\xff" * (width * height)
+    else:
+        for pixel_index, palette_index in enumerate(pixels):
+            pixel_start = pixel_index * 4
+            pixel_end = pixel_start + 3
+            palette_start = palette_index * 3
+            palette_end = palette_start + 3
+            rgba[pixel_start:pixel_end] = palette[palette_start:palette_end]
+            rgba[pixel_end] = (transparency[palette_index]
+                               if palette_index < len(transparency) else 255)
+    return width, height, rgba
+
+def encode_png(width: int,
+               height: int,
+               pixels: bytes,
+               compression_level: int = 9,
+               alpha: bool = True) -> bytes:
+    """
+    Encodes RGBA or RGB pixel bytes as a PNG image
+
+    :param int width: image width in pixels
+    :param int height: image height in pixels
+    :param bytes pixels: RGBA or RGB pixel bytes in rows from top to bottom
+    :param int compression_level: zlib compression level from 0 to 9
+    :param bool alpha: True if the pixels are RGBA, False if they are RGB
+    """
+
+    def chunk(chunk_type: bytes, content: bytes) -> bytes:
+        return (struct.pack(">I", len(content)) + chunk_type + content
+                + struct.pack(">I", zlib.crc32(chunk_type + content)))
+
+    stride = width * (4 if alpha else 3)
+    raw = bytearray((stride + 1) * height)
+    view = memoryview(pixels).cast("B")
+    for row_index in range(height):
+        # Every row is stored without a filter, the filter type byte stays 0
+        start = row_index * (stride + 1) + 1
+        raw[start:start + stride] = view[row_index * stride:(row_index + 1) * stride]
+
+    color_type = 6 if alpha else 2
+    return b"".join((
+        PNG_SIGNATURE,
+        chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, color_type, 0, 0, 0)),
+        chunk(b"IDAT", zlib.compress(raw, compression_level)),
+        chunk(b"IEND", b"")
+    ))
+
+def write_png(path: str, width: int, height: int, rgba: bytes, compression_level: int = 9):
+    """
+    Writes RGBA pixel bytes into a PNG file
+
+    :param str path: path of the PNG file
+    :param int width: image width in pixels
+    :param int height: image height in pixels
+    :param bytes rgba: RGBA pixel bytes in rows from top to bottom
+    :param int compression_level: zlib compression level from 0 to 9
+    """
+
+    with open(path, "wb") as png_file:
+        png_file.write(encode_png(width, height, rgba, compression_level))
@@ -27,19 +27,31 @@ if modifiers & sweeperlib.MOD_SHIFT:
     # somethinghappens
 """
 
-import pyglet # pylint: disable=import-error
-from pyglet.gl import glEnable, GL_TEXTURE_2D # pylint: disable=import-error
-from pyglet.window import mouse # pylint: disable=import-error
+import os
+import types
+from collections import OrderedDict
 
-MOUSE_LEFT = mouse.LEFT
-MOUSE_MIDDLE = mouse.MIDDLE
-MOUSE_RIGHT = mouse.RIGHT
+from app.lib.atlas import SPRITE_FILES, read_manifest
 
-MOD_SHIFT = pyglet.window.key.MOD_SHIFT
-MOD_CTRL = pyglet.window.key.MOD_CTRL
-MOD_ALT = pyglet.window.key.MOD_ALT
+# Same values as in pyglet.window.mouse and pyglet.window.key, defined here
+# so that pyglet is not imported before the graphics are needed
+MOUSE_LEFT = 1
+MOUSE_MIDDLE = 2
+MOUSE_RIGHT = 4
 
-pyglet.resource.add_font("resources/fonts/big_blue_term.ttf")
+MOD_SHIFT = 1
+MOD_CTRL = 2
+MOD_ALT = 4
+
+DEFAULT_FONT = "BigBlueTerm437 Nerd Font Mono"
+
+# Amount of text labels kept in the label cache
+LABEL_CACHE_SIZE = 64
+# Drawing order of text placed into sprite slots, above all sprites
+TEXT_LAYER = 100
+
+# Pyglet is imported by `init_graphics` on the first call that needs it
+pyglet = None
 
 # Variables required for drawing graphics are saved to this dictionary so that
 # they can be easily accessed in all functions. A similar solution is
@@ -51,55 +63,84 @@ graphics = {
     "bg_color": None,
     "batch": None,
     "sprites": [],
-    "images": {}
+    "images": {},
+    "slot_batch": None,
+    "slots": {},
+    "text_slots": {},
+    "layers": {},
+    "labels": OrderedDict(),
+    "atlas": None,
+    "tile_keys": {},
+    "tile_tex_coords": [],
+    "tilemaps": {}
 }
 
 handlers = {
     "timeouts": [],
 }
 
-glEnable(GL_TEXTURE_2D)
+# Redraw state of the event loop, see `invalidate`
+redraw = {
+    "dirty": True,
+    "frame_interval": 0.0,
+    "last_frame": float("-inf")
+}
 
-def load_sprites(path: str):
+def init_graphics():
+    """
+    Imports pyglet and prepares it for drawing. Called by the functions that
+    start using graphics, so that programs importing this module start fast
+    and can run without a display until a window is needed.
     """
-    Loads the sprites used for minesweeper tiles.
 
-    The function uses Pyglet's resouce module which loads the images in a
-    rather intelligent way. References to individual images are stored to a 
-    dictionary so that they can be readily accessed later.
+    global pyglet # pylint: disable=global-statement
+    if pyglet is not None:
+        return
 
-    Path should be given as relative.
+    import pyglet as pyglet_module # pylint: disable=import-error,import-outside-toplevel
+    pyglet = pyglet_module
+    pyglet.resource.add_font("resources/fonts/big_blue_term.ttf")
+    pyglet.gl.glEnable(pyglet.gl.GL_TEXTURE_2D)
 
-    :param list[str] path: list of paths to be loaded
+def load_sprites(path: str):
     """
+    Loads the sprites used for minesweeper tiles.
 
-    pyglet.resource.path = [path]
-    images = {}
-
-    # Load tile sprites
-    images['0'] = pyglet.resource.image(f"{path}/tiles/tile_empty.png")
-    for i in range(1, 9):
-        images[str(i)] = pyglet.resource.image(f"{path}/tiles/tile_{i}.png")
-    images['x'] = pyglet.resource.image(f"{path}/tiles/tile_mine.png")
-    images[' '] = pyglet.resource.image(f"{path}/tiles/tile_back.png")
-    images['f'] = pyglet.resource.image(f"{path}/tiles/tile_flag.png")
-    images['X'] = pyglet.resource.image(f"{path}/tiles/tile_mine_explode.png")
-    images['F'] = pyglet.resource.image(f"{path}/tiles/tile_mine_incorrect.png")
-
-    # Load face sprites
-    images["face-smiley"] = pyglet.resource.image(f"{path}/faces/face-smiley.png")
-    images["face-lose"] = pyglet.resource.image(f"{path}/faces/face-lose.png")
-    images["face-win"] = pyglet.resource.image(f"{path}/faces/face-win.png")
+    The sprites are sliced from the texture atlas of the sprite directory so
+    that only one image file is opened and every sprite shares the same
+    texture. This lets a batch draw all of them with a single texture bind.
+    If the directory has no atlas, the images are loaded one by one with
+    Pyglet's resource module. References to individual images are stored to
+    a dictionary so that they can be readily accessed later.
 
-    # Load display sprites
-    for i in range(0, 10):
-        images[f"display-{i}"] = pyglet.resource.image(f"{path}/display/display-{i}.png")
-    images["display-empty"] = pyglet.resource.image(f"{path}/display/display-empty.png")
-    images["display--"] = pyglet.resource.image(f"{path}/display/display-line.png")
+    The atlas can be rebuilt with: python -m app.lib.atlas resources/sprites
 
-    images["end-plate"] = pyglet.resource.image(f"{path}/end_plate.png")
+    Path should be given as relative.
 
-    graphics["images"] = images
+    :param str path: sprite directory to be loaded
+    """
+
+    init_graphics()
+    manifest = read_manifest(path)
+    if manifest is not None:
+        atlas = pyglet.image.load(os.path.join(path, manifest["image"])).get_texture()
+        graphics["images"] = {
+            key: atlas.get_region(*region) for key, region in manifest["regions"].items()
+        }
+        # Tilemaps refer to the sprites by their position in this table
+        graphics["atlas"] = atlas
+        graphics["tile_keys"] = {key: index for index, key in enumerate(graphics["images"])}
+        graphics["tile_tex_coords"] = [
+            tuple(image.tex_coords) for image in graphics["images"].values()
+        ]
+        return
+
+    graphics["atlas"] = None
+    pyglet.resource.path = [path]
+    graphics["images"] = {
+        key: pyglet.resource.image(f"{path}/{file_name}")
+        for key, file_name in SPRITE_FILES.items()
+    }
 
 def create_window(width=800, height=600, bg_color=(240, 240, 240, 255), title="sweeperlib"):
     """
@@ -114,14 +155,19 @@ def create_window(width=800, height=600, bg_color=(240, 240, 240, 255), title="s
                            (0-255, RGBA)
     """
 
+    init_graphics()
     if graphics["window"] is None:
         graphics["window"] = pyglet.window.Window(width, height, resizable=False)
         graphics["bg_color"] = bg_color
         graphics["background"] = pyglet.sprite.Sprite(
             pyglet.image.SolidColorImagePattern(bg_color).create_image(width, height)
         )
+        # Clearing the window paints the background color without a texture
+        pyglet.gl.glClearColor(*(channel / 255 for channel in bg_color))
         graphics["window"].set_visible(False)
         graphics["window"].on_close = close
+        # Uncovered parts of the window need to be drawn again
+        graphics["window"].push_handlers(on_expose=invalidate)
         graphics["window"].set_caption(title)
     else:
         resize_window(width, height)
@@ -136,6 +182,7 @@ def resize_window(width, height):
     """
 
     graphics["window"].set_size(width, height)
+    invalidate()
     graphics["background"] = pyglet.sprite.Sprite(
         pyglet.image.SolidColorImagePattern(graphics["bg_color"]).create_image(width, height)
     )
@@ -232,6 +279,29 @@ def set_release_handler(handler):
     else:
         print("Window hasn't been created!")
 
+def set_scroll_handler(handler):
+    """
+    Sets a function that is used to handle the mouse wheel. The handler must
+    be a function with four parameters: x, y, scroll_x and scroll_y. X and y
+    are the cursor's position inside the window, scroll_x and scroll_y are the
+    amount of steps the wheel was turned. Scroll_y is positive when the wheel
+    is turned away from the user.
+
+    def scroll_handler(x, y, scroll_x, scroll_y):
+        # things happen
+
+    and register it:
+
+    sweeperlib.set_scroll_handler(scroll_handler)
+
+    :param function handler: handler function for mouse wheel
+    """
+
+    if graphics["window"]:
+        graphics["window"].on_mouse_scroll = handler
+    else:
+        print("Window hasn't been created!")
+
 def set_keyboard_handler(handler):
     """
     Sets a function that is for handling keyboard input. You won't need this
@@ -275,6 +345,18 @@ def set_draw_handler(handler):
     prepare_sprite (prepares a sprite to be drawn)
     draw_sprites (draws all prepared sprites at once)
     draw_text (writes some text - optional)
+
+    Sprites that stay on the screen between frames can instead be kept in
+    sprite slots that are created once and reused on every frame:
+
+    set_sprite (places a sprite into a slot)
+    hide_sprite (hides the sprite of a slot)
+    set_text (places text into a slot, drawn above the sprites)
+    hide_text (hides the text of a slot)
+    draw_sprite_slots (draws the sprites of all slots at once)
+
+    The handler is called only after `invalidate` has marked the window
+    contents as outdated, so call it whenever the drawn state changes.
     
     :param function handler: handler function for drawing
     """
@@ -305,16 +387,72 @@ def set_interval_handler(handler, interval=1/60):
     :param float interval: interval between calls, default 1/60
     """
 
+    init_graphics()
     pyglet.clock.schedule_interval(handler, interval)
     handlers["timeouts"].append(handler)
 
-def start():
+def redraw_idle(event_loop):
+    """
+    Idle method of the event loop that draws the windows only after
+    `invalidate` has been called. Set on pyglet's event loop by `start`.
+
+    Pyglet's own idle method redraws the windows after every event and every
+    scheduled function call, which keeps the whole scene being drawn even
+    when nothing on it changes. This one runs the scheduled functions as
+    usual but lets the loop sleep until the next event or scheduled call
+    while the window is up to date.
+
+    Returns the time to sleep before the next call, or None to wait for
+    the next event.
+
+    :param pyglet.app.EventLoop event_loop: the running event loop
+    """
+
+    clock = event_loop.clock
+    clock.call_scheduled_functions(clock.update_time())
+
+    sleep_time = clock.get_sleep_time(True)
+    if not redraw["dirty"]:
+        return sleep_time
+
+    frame_wait = redraw["last_frame"] + redraw["frame_interval"] - clock.time()
+    if frame_wait > 0:
+        # Drawing is postponed until the frame rate cap allows it
+        return frame_wait if sleep_time is None else min(sleep_time, frame_wait)
+
+    redraw["dirty"] = False
+    redraw["last_frame"] = clock.time()
+    for window in pyglet.app.windows:
+        window.switch_to()
+        window.dispatch_event("on_draw")
+        window.flip()
+    return sleep_time
+
+def invalidate():
+    """
+    Marks the window contents as outdated so that the draw handler is called
+    before the next frame. Call this from your handlers whenever they change
+    something that is drawn - the window is not redrawn otherwise.
+    """
+
+    redraw["dirty"] = True
+
+def start(max_fps=None):
     """
     Starts the game. You need to create a window and set handlers before
     calling this.
+
+    The window is drawn only after `invalidate` has been called, at most
+    `max_fps` times per second if given.
+
+    :param float max_fps: optional frame rate cap
     """
 
+    init_graphics()
+    pyglet.app.event_loop.idle = types.MethodType(redraw_idle, pyglet.app.event_loop)
+    redraw["frame_interval"] = 1 / max_fps if max_fps else 0.0
     graphics["window"].set_visible(True)
+    invalidate()
     pyglet.app.run()
 
 def close():
@@ -326,6 +464,7 @@ def close():
     """
     for handler in handlers["timeouts"]:
         pyglet.clock.unschedule(handler)
+    clear_sprite_slots()
     pyglet.app.exit()
     graphics["window"].set_visible(False)
 
@@ -344,17 +483,61 @@ def draw_background():
 
     graphics["background"].draw()
 
+def get_label(text, color, font, size, anchor):
+    """
+    Returns a text label from the label cache. Laying out text is slow, so
+    labels are created only once for each combination of text, font, size,
+    color and anchor and the least recently used labels are deleted when
+    the cache has more than LABEL_CACHE_SIZE labels. Labels shown in text
+    slots are never deleted.
+
+    :param str text: string to display
+    :param tuple color: color value, a tuple of four integers (RGBA)
+    :param str font: name of the font family
+    :param int size: fontin size as points
+    :param tuple anchor: (anchor_x, anchor_y) of the label
+    """
+
+    key = (text, font, size, tuple(color), tuple(anchor))
+    labels = graphics["labels"]
+    label = labels.get(key)
+    if label is not None:
+        labels.move_to_end(key)
+        return label
+
+    label = pyglet.text.Label(text,
+        font_name=font,
+        font_size=size,
+        color=color,
+        anchor_x=anchor[0], anchor_y=anchor[1],
+        group=get_layer(TEXT_LAYER)
+    )
+    labels[key] = label
+
+    if len(labels) > LABEL_CACHE_SIZE:
+        shown_labels = list(graphics["text_slots"].values())
+        for old_key, old_label in labels.items():
+            if old_label not in shown_labels:
+                old_label.delete()
+                del labels[old_key]
+                break
+    return label
+
 def draw_text(text,
               pos: tuple[int, int],
               color=(0, 0, 0, 255),
-              font="BigBlueTerm437 Nerd Font Mono",
-              size=32):
+              font=DEFAULT_FONT,
+              size=32,
+              anchor=("left", "bottom")):
     """
     Draws text on the screen. Can be used if you want to write something to
     the game window (e.g. counters or instructions). Default font is serif,
     size 32, color black. These can be altered by providing the function its
     optional arguments. The x and y coordinates define the bottom left corner
     of the text.
+
+    Labels are reused from the label cache so drawing the same text again
+    doesn't lay it out again.
     
     Text, if any, should be drawn last.
     
@@ -364,17 +547,64 @@ def draw_text(text,
     :param tuple color: color value, a tuple of four integers (RGBA)
     :param str font: name of the font family
     :param int size: fontin size as points
+    :param tuple anchor: (anchor_x, anchor_y) of the text, by default the
+                         coordinates are the bottom left corner
     """
 
-    text_box = pyglet.text.Label(text,
-        font_name=font,
-        font_size=size,
-        color=color,
-        x=pos[0], y=pos[1],
-        anchor_x="left", anchor_y="bottom"
-    )
+    text_box = get_label(text, color, font, size, anchor)
+    if text_box.position != (pos[0], pos[1]):
+        text_box.position = (pos[0], pos[1])
     text_box.draw()
 
+def set_text(slot,
+             text,
+             pos: tuple[int, int],
+             color=(0, 0, 0, 255),
+             font=DEFAULT_FONT,
+             size=32,
+             anchor=("left", "bottom")):
+    """
+    Retained-mode alternative to draw_text. Places a cached label into the
+    given text slot. The label is moved into the same batch as the sprite
+    slots, above all sprites, and is drawn with draw_sprite_slots until the
+    slot is given another text or hidden with hide_text. Slots showing
+    identical text share the same label.
+
+    :param slot: identifier of the text slot
+    :param str text: string to display
+    :param tuple pos: (x, y) coordinates of the text
+    :param tuple color: color value, a tuple of four integers (RGBA)
+    :param str font: name of the font family
+    :param int size: fontin size as points
+    :param tuple anchor: (anchor_x, anchor_y) of the text
+    """
+
+    if graphics["slot_batch"] is None:
+        graphics["slot_batch"] = pyglet.graphics.Batch()
+
+    text_box = get_label(text, color, font, size, anchor)
+    previous_text_box = graphics["text_slots"].get(slot)
+    if previous_text_box is not None and previous_text_box is not text_box:
+        hide_text(slot)
+
+    if text_box.batch is not graphics["slot_batch"]:
+        text_box.batch = graphics["slot_batch"]
+    if text_box.position != (pos[0], pos[1]):
+        text_box.position = (pos[0], pos[1])
+    graphics["text_slots"][slot] = text_box
+
+def hide_text(slot):
+    """
+    Removes the label of the given text slot from the sprite slot batch.
+    The label stays in the label cache. Does nothing if the slot is empty.
+
+    :param slot: identifier of the text slot
+    """
+
+    text_box = graphics["text_slots"].pop(slot, None)
+    if text_box is not None and text_box not in graphics["text_slots"].values():
+        text_box.batch = None
+
 def begin_sprite_draw():
     """
     Starts the drawing of sprites (tiles) by initializing a batch where all
@@ -418,6 +648,209 @@ def draw_sprites():
     graphics["batch"].draw()
     graphics["sprites"].clear()
 
+def set_sprite(slot, key, x, y, layer=0, scale=1.0):
+    """
+    Retained-mode alternative to prepare_sprite. Places the sprite selected
+    by the key into the given slot. The slot can be any hashable value, e.g.
+    the index of a tile. The sprite of a slot is created only once and kept
+    between frames, after that only its image and position are changed when
+    they differ from the previous frame. All slots are drawn at once with
+    draw_sprite_slots.
+
+    Sprites on a higher layer are drawn on top of lower layers.
+
+    :param slot: identifier of the sprite slot
+    :param str key: key, used to select the sprite
+    :param int x: bottom left x coordinate
+    :param int y: bottom left y coordinate
+    :param int layer: drawing order of the sprite
+    :param float scale: size multiplier of the sprite
+    """
+
+    image = graphics["images"][str(key)]
+    sprite = graphics["slots"].get(slot)
+    if sprite is None:
+        if graphics["slot_batch"] is None:
+            graphics["slot_batch"] = pyglet.graphics.Batch()
+        sprite = pyglet.sprite.Sprite(
+            image,
+            x,
+            y,
+            batch=graphics["slot_batch"],
+            group=get_layer(layer)
+        )
+        if scale != 1.0:
+            sprite.scale = scale
+        graphics["slots"][slot] = sprite
+        return
+
+    if sprite.image is not image:
+        sprite.image = image
+    if sprite.x != x or sprite.y != y:
+        sprite.position = (x, y)
+    if sprite.scale != scale:
+        sprite.scale = scale
+    if not sprite.visible:
+        sprite.visible = True
+
+def get_layer(layer):
+    """
+    Returns the ordered group used for drawing the given layer.
+
+    :param int layer: drawing order of the layer
+    """
+
+    if layer not in graphics["layers"]:
+        graphics["layers"][layer] = pyglet.graphics.OrderedGroup(layer)
+    return graphics["layers"][layer]
+
+def hide_sprite(slot):
+    """
+    Hides the sprite of the given slot until set_sprite is called for it
+    again. Does nothing if the slot has no sprite.
+
+    :param slot: identifier of the sprite slot
+    """
+
+    sprite = graphics["slots"].get(slot)
+    if sprite is not None and sprite.visible:
+        sprite.visible = False
+
+def can_draw_tilemaps():
+    """
+    Returns True if the sprites were loaded from a texture atlas. Tilemaps
+    draw all of their tiles from one texture, so they cannot be used with
+    sprites loaded one by one.
+    """
+
+    return graphics["atlas"] is not None
+
+def create_tilemap(slot, columns, rows, layer=0):
+    """
+    Creates a tilemap of columns x rows tiles into the given slot. A tilemap
+    is a single vertex list of quads that is drawn together with the sprite
+    slots, so drawing it takes one draw call no matter how many tiles it
+    has. The tiles are kept as a compact array of sprite indices, changing
+    tiles with set_tilemap_tiles only rewrites the texture coordinates of
+    the changed part of the vertex list.
+
+    Cells are numbered row by row starting from the bottom left corner. The
+    tilemap is not drawn before it is placed with place_tilemap. Requires
+    sprites loaded from an atlas, see can_draw_tilemaps.
+
+    :param slot: identifier of the tilemap
+    :param int columns: amount of tiles on each row
+    :param int rows: amount of rows
+    :param int layer: drawing order of the tilemap
+    """
+
+    delete_tilemap(slot)
+    if graphics["slot_batch"] is None:
+        graphics["slot_batch"] = pyglet.graphics.Batch()
+    count = columns * rows
+    graphics["tilemaps"][slot] = {
+        "columns": columns,
+        "rows": rows,
+        "tiles": bytearray(count),
+        "vertex_list": graphics["slot_batch"].add(
+            count * 4,
+            pyglet.gl.GL_QUADS,
+            pyglet.graphics.TextureGroup(graphics["atlas"], parent=get_layer(layer)),
+            ("v2f/dynamic", (0.0,) * (count * 8)),
+            ("t3f/dynamic", graphics["tile_tex_coords"][0] * count)
+        )
+    }
+
+def place_tilemap(slot, x, y, tile_size, columns, rows):
+    """
+    Positions the tiles of a tilemap. The bottom left tile is placed at x, y
+    and every tile is tile_size pixels large. Only the tiles of the first
+    columns and rows are drawn, so a view smaller than the tilemap can be
+    shown without recreating it.
+
+    :param slot: identifier of the tilemap
+    :param float x: bottom left x coordinate
+    :param float y: bottom left y coordinate
+    :param float tile_size: width and height of a tile in pixels
+    :param int columns: amount of drawn tiles on each row
+    :param int rows: amount of drawn rows
+    """
+
+    tilemap = graphics["tilemaps"][slot]
+    vertices = []
+    hidden = (0.0,) * 8
+    for row in range(tilemap["rows"]):
+        bottom, top = y + row * tile_size, y + (row + 1) * tile_size
+        for column in range(tilemap["columns"]):
+            if column >= columns or row >= rows:
+                # Hidden tiles are collapsed into a point
+                vertices.extend(hidden)
+                continue
+            left, right = x + column * tile_size, x + (column + 1) * tile_size
+            vertices.extend((left, bottom, right, bottom, right, top, left, top))
+    tilemap["vertex_list"].vertices[:] = vertices
+
+def set_tilemap_tiles(slot, index, keys):
+    """
+    Sets the sprites of consecutive tiles of a tilemap starting from the
+    given cell index (row * columns + column). Only the texture coordinates
+    of the tiles that change are written into the vertex list.
+
+    :param slot: identifier of the tilemap
+    :param int index: cell index of the first tile
+    :param keys: sprite keys of the tiles, one for each tile
+    """
+
+    tilemap = graphics["tilemaps"][slot]
+    tile_keys = graphics["tile_keys"]
+    tile_indices = bytes(tile_keys[str(key)] for key in keys)
+    stop = index + len(tile_indices)
+    if tilemap["tiles"][index:stop] == tile_indices:
+        return
+
+    tilemap["tiles"][index:stop] = tile_indices
+    tex_coords = graphics["tile_tex_coords"]
+    tilemap["vertex_list"].tex_coords[index * 12:stop * 12] = [
+        coord for tile_index in tile_indices for coord in tex_coords[tile_index]
+    ]
+
+def delete_tilemap(slot):
+    """
+    Deletes the tilemap of the given slot. Does nothing if the slot has no
+    tilemap.
+
+    :param slot: identifier of the tilemap
+    """
+
+    tilemap = graphics["tilemaps"].pop(slot, None)
+    if tilemap is not None:
+        tilemap["vertex_list"].delete()
+
+def draw_sprite_slots():
+    """
+    Draws the sprites of all slots in one go.
+    """
+
+    if graphics["slot_batch"] is not None:
+        graphics["slot_batch"].draw()
+
+def clear_sprite_slots():
+    """
+    Deletes the sprites and tilemaps of all slots and empties the text slots
+
+    Called when the window is closed so that the next game starts
+    with no sprites left over from the last one.
+    """
+
+    for sprite in graphics["slots"].values():
+        sprite.delete()
+    graphics["slots"].clear()
+    for slot in list(graphics["tilemaps"]):
+        delete_tilemap(slot)
+    for slot in list(graphics["text_slots"]):
+        hide_text(slot)
+    graphics["slot_batch"] = None
+
 if __name__ == "__main__":
     # Disabling two pylint warnings because it would complain about the test
     # code despite it being perfectly valid.
@@ -2,6 +2,7 @@
 Helper functions for getting valid user inputs
 """
 from app.game import game_constants
+from app.game.board_pool import BoardPool, is_no_guess_supported
 
 def prompt_int(message: str, err_message: str, prompt_min: int, prompt_max: int) -> int:
     """
@@ -32,6 +33,24 @@ def prompt_int(message: str, err_message: str, prompt_min: int, prompt_max: int)
             print(err_message)
             print(f"Minimum value: {prompt_min} Maximum value: {prompt_max}")
 
+def prompt_yes_no(message: str) -> bool:
+    """
+    Prompts the user for a yes or no answer.
+    Keeps trying until user gives valid input
+
+    Can raise a KeyboardInterrupt
+
+    :params str message: Message to prompt the user
+    """
+    while True:
+        match input(message).lower():
+            case "y":
+                return True
+            case "n":
+                return False
+            case _:
+                print("Answer with y or n")
+
 def prompt_difficulty() -> int:
     """
     Prompts for game difficulty, returns difficulty as defined in `constants.py`
@@ -59,7 +78,7 @@ def prompt_difficulty() -> int:
             case _:
                 print("\nNot a valid difficulty")
 
-def get_game_properties() -> dict:
+def get_game_properties(board_pool: BoardPool | None = None) -> dict:
     """
     Prompts user for game properties
 
@@ -69,10 +88,25 @@ def get_game_properties() -> dict:
     - mine-count: int
     - player-name: str
     - difficulty: int
+    - no-guess: bool
+    - chunked: bool
+    - endless: bool
+    - mine-density: float
+
+    Boards with a side longer than `CLASSIC_BOARD_MAX_SIZE` are chunked,
+    they are scrolled through a viewport and cannot be no-guess boards.
+    No-guess boards are offered only for boards supported by
+    `is_no_guess_supported`, the board pool starts generating them
+    before the player is asked
+
+    :params BoardPool | None board_pool: pool of pregenerated no-guess boards
     """
     print("\n-- New Game --")
     player_name = input("  Player name: ")
 
+    if prompt_yes_no("  Endless board? (y/n): "):
+        return get_endless_game_properties(player_name)
+
     game_x_size = prompt_int(
                         "  Give game size X: ",
                         "Not a valid size",
@@ -96,13 +130,14 @@ def get_game_properties() -> dict:
                                 "\nNot a valid value\n",
                                 1, game_x_size * game_y_size - 1)
     else:
-        match difficulty:
-            case game_constants.DIFFICULTY_EASY:
-                mine_count = round(total_tiles * 0.10)
-            case game_constants.DIFFICULTY_MEDIUM:
-                mine_count = round(total_tiles * 0.20)
-            case game_constants.DIFFICULTY_HARD:
-                mine_count = round(total_tiles * 0.30)
+        mine_count = round(total_tiles * game_constants.DIFFICULTY_MINE_DENSITY[difficulty])
+
+    chunked = max(game_x_size, game_y_size) > game_constants.CLASSIC_BOARD_MAX_SIZE
+    no_guess = False
+    if is_no_guess_supported((game_x_size, game_y_size), mine_count):
+        if board_pool is not None:
+            board_pool.fill((game_x_size, game_y_size), mine_count)
+        no_guess = prompt_yes_no("  Only boards solvable without guessing? (y/n): ")
 
     return {
         "board-size": (game_x_size, game_y_size),
@@ -110,5 +145,39 @@ def get_game_properties() -> dict:
                           game_y_size * game_constants.TILE_SPRITE_SIZE_PX),
         "mine-count": mine_count,
         "player-name": player_name,
-        "difficulty": difficulty
+        "difficulty": difficulty,
+        "no-guess": no_guess,
+        "chunked": chunked,
+        "endless": False,
+        "mine-density": mine_count / total_tiles
+    }
+
+def get_endless_game_properties(player_name: str) -> dict:
+    """
+    Prompts user for the mine density of an endless board
+
+    returns a dict of properties with the same keys as `get_game_properties`
+
+    :params str player_name: name of the player
+    """
+    difficulty = prompt_difficulty()
+    if difficulty == game_constants.DIFFICULTY_CUSTOM:
+        mine_density = prompt_int("Percentage of mines?: ",
+                                  "\nNot a valid value\n",
+                                  1, 90) / 100
+    else:
+        mine_density = game_constants.DIFFICULTY_MINE_DENSITY[difficulty]
+
+    board_size = game_constants.INFINITE_BOARD_SIZE
+    return {
+        "board-size": (board_size, board_size),
+        "board-size-px": (board_size * game_constants.TILE_SPRITE_SIZE_PX,
+                          board_size * game_constants.TILE_SPRITE_SIZE_PX),
+        "mine-count": round(board_size * board_size * mine_density),
+        "player-name": player_name,
+        "difficulty": difficulty,
+        "no-guess": False,
+        "chunked": True,
+        "endless": True,
+        "mine-density": mine_density
     }
@@ -1,38 +1,121 @@
 """
 Reader and writer for scoreboard logging of the minesweeper game
 
-Uses a JSON file as a db for simplicity
-from which migration should be relatively simple
+Scores are stored either in an SQLite database with indexed leaderboard
+queries or in a JSON Lines file where every finished game is a single
+appended line. Either way writing a score does not depend on the size of
+the history. Scores of the older single-array JSON file are migrated into
+the JSON Lines file once, and the JSON Lines records are imported into a
+newly created SQLite database.
+
+Statistics per player, difficulty and board size are updated with every
+written record, on the JSON Lines backend when they are read next. They
+can be recomputed from the records with:
+
+    $ python -m app.scoreboard_logging rebuild-stats
 """
 
+import argparse
 import datetime
+import heapq
 import json
+import os
+import sqlite3
+from collections.abc import Iterable, Iterator
+from contextlib import closing
+from app import scoreboard_sqlite
+from app import scoreboard_stats
 from app.game import game_constants
+from app.game.move_log import encode_move_log
+
+# Storage of the scores, either "sqlite" or "jsonl"
+SCOREBOARD_BACKEND = "sqlite"
+
+# Amount of records shown on one page of the scoreboard
+SCOREBOARD_PAGE_SIZE = 10
+
+SQLITE_DB_FILENAME = "app/game_scores.db"
+DB_FILENAME = "app/game_scores.jsonl"
+# Scoreboard file of earlier versions that stored all records in one JSON array
+LEGACY_DB_FILENAME = "app/game_scores.json"
+
+def migrate_json_scores():
+    """
+    Converts the records of the legacy JSON array file into
+    the JSON Lines file if it has not been created yet
 
-DB_FILENAME = "app/game_scores.json"
+    The legacy file is left in place
+    """
+    if os.path.exists(DB_FILENAME) or not os.path.exists(LEGACY_DB_FILENAME):
+        return
+
+    with open(LEGACY_DB_FILENAME, 'r', encoding="UTF-8") as legacy_file:
+        records = json.load(legacy_file)
+
+    # Written into a temporary file first so that an interrupted
+    # migration does not leave a partial scoreboard behind
+    temporary_filename = f"{DB_FILENAME}.tmp"
+    with open(temporary_filename, 'w', encoding="UTF-8") as db_file:
+        for record in records:
+            db_file.write(json.dumps(record) + "\n")
+    os.replace(temporary_filename, DB_FILENAME)
+
+def open_database() -> sqlite3.Connection:
+    """
+    Opens the SQLite scoreboard
 
-def get_scoreboard_data():
+    A new database is filled with the records of the JSON Lines file
+    """
+    return scoreboard_sqlite.connect(SQLITE_DB_FILENAME, read_json_lines)
+
+def get_scoreboard_data() -> Iterator[dict]:
     """
     Used in the tkinter application to get printable
     scoreboard data.
+
+    Yields the records one at a time in the order they were written
+    without loading the whole history into memory
+    """
+    if SCOREBOARD_BACKEND == "sqlite":
+        with closing(open_database()) as connection:
+            yield from scoreboard_sqlite.iter_records(connection)
+    else:
+        yield from read_json_lines()
+
+def read_json_lines() -> Iterator[dict]:
     """
+    Yields the records of the JSON Lines file one at a time
+    """
+    migrate_json_scores()
     try:
         with open(DB_FILENAME, 'r', encoding="UTF-8") as db_file:
-            return json.load(db_file)
+            for line in db_file:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    # Line cut off by a crash during a write
+                    continue
     except FileNotFoundError:
-        return []
+        return
 
-def write_scoreboard_data(
+def make_score_record(
     player_name: str,
     difficulty: int,
     turns_used: int,
     time_spent: int,
     to_reveal: int,
-    game_size: tuple[int, int]
-    ):
+    game_size: tuple[int, int],
+    mine_count: int | None = None,
+    seed: int | None = None,
+    move_log: bytes | None = None,
+    engine: str | None = None
+    ) -> dict:
     """
-    Used in the pyglet application to write
-    scoreboard data.
+    Creates the scoreboard record of a game that ended now
+
+    Records with the mine count, seed and move log can be replayed
+    with `app.game.replay.Replay.from_record` on the board engine
+    named by `engine`
 
     :params str player_name: Player name
     :params int difficulty: Difficulty identifier found in`game_constants.py`
@@ -40,9 +123,11 @@ def write_scoreboard_data(
     :params int time_spent: How much time was spent during a game
     :params int to_reveal: How many tiles were to be revealed
     :params tuple[int, int] game_size: Game size in (x_size, y_size) format
+    :params int | None mine_count: Number of mines on the board
+    :params int | None seed: Seed of the game
+    :params bytes | None move_log: Move log of the game, stored as base64 text
+    :params str | None engine: `engine_name` of the board engine of the game
     """
-    existing_data = get_scoreboard_data()
-
     dt = datetime.datetime.now()
 
     difficulty_str = ""
@@ -56,7 +141,7 @@ def write_scoreboard_data(
         case game_constants.DIFFICULTY_CUSTOM:
             difficulty_str = "Custom"
 
-    score_data = ({
+    return {
         "player_name": player_name,
         "difficulty": difficulty_str,
         "time_spent": time_spent,
@@ -65,33 +150,236 @@ def write_scoreboard_data(
         "time": dt.strftime("%H:%M"),
         "ymd": dt.strftime("%Y/%m/%d"),
         "game_size_x": game_size[0],
-        "game_size_y": game_size[1]
-    },)
+        "game_size_y": game_size[1],
+        "mine_count": mine_count,
+        "seed": seed,
+        "moves": None if move_log is None else encode_move_log(move_log),
+        "engine": engine
+    }
 
-    existing_data.extend(score_data)
+def write_scoreboard_data(
+    player_name: str,
+    difficulty: int,
+    turns_used: int,
+    time_spent: int,
+    to_reveal: int,
+    game_size: tuple[int, int]
+    ):
+    """
+    Used in the pyglet application to write
+    scoreboard data.
 
-    with open(DB_FILENAME, 'w', encoding='UTF-8') as db_file:
-        json.dump(existing_data, db_file)
+    :params str player_name: Player name
+    :params int difficulty: Difficulty identifier found in`game_constants.py`
+    :params int turns_used: How many turns were played before game ended
+    :params int time_spent: How much time was spent during a game
+    :params int to_reveal: How many tiles were to be revealed
+    :params tuple[int, int] game_size: Game size in (x_size, y_size) format
+    """
+    append_records([make_score_record(player_name, difficulty, turns_used,
+                                      time_spent, to_reveal, game_size)])
 
-def print_scores():
+def append_records(records: list[dict]):
     """
-    Prints the scoreboard to stdout
+    Writes score records into the scoreboard with a single flush
+    and updates their statistics
+
+    The JSON Lines records are only appended, their statistics
+    are added by `load_json_lines_stats`
+
+    :params list[dict] records: records created with `make_score_record`
     """
-    records: list[dict] = []
-    for record in get_scoreboard_data():
-        records.append(record)
-        records = sorted(records, key=lambda record: record["to_reveal"])
+    if SCOREBOARD_BACKEND == "sqlite":
+        with closing(open_database()) as connection:
+            scoreboard_sqlite.insert_records(connection, records)
+        return
 
-    if len(records) != 0:
-        print("\n--    Scoreboard    --")
-        for record in records:
-            win_status = "Win"
-            if record["to_reveal"] != 0:
-                win_status = f"Loss, {record["to_reveal"]} tiles left unexplored"
-            print(f"{record["player_name"]} @ {record["time"]} {record["ymd"]}\n"
-                    f"{win_status}\n"
-                    f"{record["difficulty"]} {record["game_size_x"]}x{record["game_size_y"]}\n"
-                    f"game lasted for {record["time_spent"]}s\n"
-                    f"made {record["turns_used"]} turns\n")
+    migrate_json_scores()
+    with open(DB_FILENAME, 'ab+') as db_file:
+        # A line cut off by a crash is ended so that it does not corrupt these records
+        if db_file.seek(0, os.SEEK_END) > 0:
+            db_file.seek(-1, os.SEEK_END)
+            if db_file.read(1) != b"\n":
+                db_file.write(b"\n")
+        db_file.write("".join(json.dumps(record) + "\n" for record in records).encode("UTF-8"))
+        db_file.flush()
+
+def add_json_lines_stats(stats_by_key: dict, offset: int) -> int:
+    """
+    Adds the JSON Lines records starting from the given byte offset
+    into the statistics
+
+    Returns the offset after the last complete line, a line still
+    being written is left for the next call
+
+    :params dict stats_by_key: statistics entries by their key, updated in place
+    :params int offset: byte offset of the first record to be added
+    """
+    try:
+        with open(DB_FILENAME, 'rb') as db_file:
+            db_file.seek(offset)
+            for line in db_file:
+                if not line.endswith(b"\n"):
+                    break
+                offset += len(line)
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # Line cut off by a crash during a write
+                    continue
+                key = scoreboard_stats.stats_key(record)
+                if key not in stats_by_key:
+                    stats_by_key[key] = scoreboard_stats.new_stats(record)
+                scoreboard_stats.add_record(stats_by_key[key], record)
+    except FileNotFoundError:
+        pass
+    return offset
+
+def load_json_lines_stats() -> dict:
+    """
+    Returns the statistics of the JSON Lines scoreboard by their key
+
+    The records written after the statistics file was saved are added
+    and the file is saved again with them. Statistics are computed from
+    all records if the file is missing or the scoreboard is shorter
+    than the offset of the file
+    """
+    migrate_json_scores()
+    try:
+        size = os.path.getsize(DB_FILENAME)
+    except FileNotFoundError:
+        size = 0
+
+    loaded = scoreboard_stats.load_stats_file()
+    if loaded is None or (loaded[1] is not None and loaded[1] > size):
+        stats_by_key, offset = {}, 0
+    elif loaded[1] is None:
+        # Files of earlier versions include every written record
+        stats_by_key, offset = loaded[0], size
     else:
+        stats_by_key, offset = loaded
+
+    new_offset = add_json_lines_stats(stats_by_key, offset)
+    if loaded is None or new_offset != loaded[1]:
+        scoreboard_stats.save_stats_file(stats_by_key, new_offset)
+    return stats_by_key
+
+def print_records(records: Iterable[dict]):
+    """
+    Prints the given scoreboard records to stdout
+
+    :params Iterable[dict] records: records in the order they are printed
+    """
+    has_records = False
+    for record in records:
+        if not has_records:
+            print("\n--    Scoreboard    --")
+            has_records = True
+        win_status = "Win"
+        if record["to_reveal"] != 0:
+            win_status = f"Loss, {record["to_reveal"]} tiles left unexplored"
+        print(f"{record["player_name"]} @ {record["time"]} {record["ymd"]}\n"
+                f"{win_status}\n"
+                f"{record["difficulty"]} {record["game_size_x"]}x{record["game_size_y"]}\n"
+                f"game lasted for {record["time_spent"]}s\n"
+                f"made {record["turns_used"]} turns\n")
+    if not has_records:
         print("\nNo previous scores\n")
+
+def leaderboard_key(record: dict) -> tuple[int, int, int]:
+    """
+    Sort key of the leaderboard, the best record being the smallest
+
+    :params dict record: scoreboard record
+    """
+    return record["to_reveal"], record["time_spent"], record["turns_used"]
+
+def get_leaderboard(limit: int, offset: int = 0) -> list[dict]:
+    """
+    Returns records of the leaderboard ordered with `leaderboard_key`
+
+    The JSON Lines records are streamed through a bounded heap that
+    keeps only the best `offset` + `limit` records
+
+    :params int limit: maximum amount of records
+    :params int offset: amount of best records skipped
+    """
+    if SCOREBOARD_BACKEND == "sqlite":
+        with closing(open_database()) as connection:
+            return scoreboard_sqlite.leaderboard(connection, limit, offset)
+
+    return heapq.nsmallest(offset + limit, get_scoreboard_data(), key=leaderboard_key)[offset:]
+
+def print_scores(page_size: int = SCOREBOARD_PAGE_SIZE, page: int = 0) -> bool:
+    """
+    Prints a page of the scoreboard to stdout
+
+    Returns True if there are more records after the page
+
+    :params int page_size: amount of records on a page
+    :params int page: index of the page, starting from 0
+    """
+    # One extra record tells whether there is a next page
+    records = get_leaderboard(page_size + 1, page * page_size)
+    if page > 0 and len(records) == 0:
+        print("\nNo more scores\n")
+        return False
+    print_records(records[:page_size])
+    return len(records) > page_size
+
+def get_stats() -> list[dict]:
+    """
+    Returns the statistics entries ordered by player, difficulty and board size
+    """
+    if SCOREBOARD_BACKEND == "sqlite":
+        with closing(open_database()) as connection:
+            return scoreboard_sqlite.all_stats(connection)
+
+    stats_by_key = load_json_lines_stats()
+    return [stats_by_key[key] for key in sorted(stats_by_key)]
+
+def rebuild_stats():
+    """
+    Recomputes the statistics from all records of the scoreboard
+    """
+    if SCOREBOARD_BACKEND == "sqlite":
+        with closing(open_database()) as connection:
+            scoreboard_sqlite.rebuild_stats(connection)
+    else:
+        migrate_json_scores()
+        stats_by_key = {}
+        offset = add_json_lines_stats(stats_by_key, 0)
+        scoreboard_stats.save_stats_file(stats_by_key, offset)
+
+def print_stats():
+    """
+    Prints the statistics of each player, difficulty and board size to stdout
+    """
+    entries = get_stats()
+    if len(entries) == 0:
+        print("\nNo previous scores\n")
+        return
+
+    print("\n--    Statistics    --")
+    for stats in entries:
+        best_time = "no wins"
+        if stats["best_time"] is not None:
+            best_time = f"best time {stats["best_time"]}s"
+        print(f"{stats["player_name"]} - {stats["difficulty"]} "
+                f"{stats["game_size_x"]}x{stats["game_size_y"]}\n"
+                f"{stats["wins"]}/{stats["games"]} games won, {best_time}\n"
+                f"{scoreboard_stats.average_turns(stats):.1f} turns on average\n"
+                f"current win streak {stats["streak"]}\n")
+
+def main():
+    """
+    Command line entry point for scoreboard maintenance
+    """
+    parser = argparse.ArgumentParser(description="Maintain the mine sweeper scoreboard")
+    parser.add_argument("command", choices=["rebuild-stats"])
+    parser.parse_args()
+    rebuild_stats()
+    print("Statistics rebuilt")
+
+if __name__ == "__main__":
+    main()
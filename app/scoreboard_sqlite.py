@@ -0,0 +1,260 @@
+"""
+SQLite storage for the scoreboard of the minesweeper game
+
+Records are the same dictionaries that `scoreboard_logging` writes
+into the JSON Lines file. The table is indexed for the leaderboard
+queries so that they do not need to read the whole history.
+Aggregated statistics are kept in their own table that is updated
+in the same transaction as the records are inserted. Move logs are
+stored as BLOBs and given back as base64 text like in the JSON Lines file.
+"""
+
+import sqlite3
+from collections.abc import Callable, Iterable, Iterator
+
+from app import scoreboard_stats
+from app.scoreboard_stats import STATS_KEY_FIELDS, STATS_FIELDS
+from app.game.move_log import encode_move_log, decode_move_log
+
+# Value of PRAGMA user_version once the tables are filled
+SCHEMA_VERSION = 4
+
+SCORE_COLUMNS = (
+    "player_name",
+    "difficulty",
+    "time_spent",
+    "turns_used",
+    "to_reveal",
+    "time",
+    "ymd",
+    "game_size_x",
+    "game_size_y",
+    "mine_count",
+    "seed",
+    "moves",
+    "engine"
+)
+
+# Columns added to the scores table of databases created before version 3
+REPLAY_COLUMNS = (
+    ("mine_count", "INTEGER"),
+    ("seed", "INTEGER"),
+    ("moves", "BLOB")
+)
+
+# Column added to the scores table of databases created before version 4
+ENGINE_COLUMN = ("engine", "TEXT")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scores (
+    id INTEGER PRIMARY KEY,
+    player_name TEXT NOT NULL,
+    difficulty TEXT NOT NULL,
+    time_spent INTEGER NOT NULL,
+    turns_used INTEGER NOT NULL,
+    to_reveal INTEGER NOT NULL,
+    time TEXT NOT NULL,
+    ymd TEXT NOT NULL,
+    game_size_x INTEGER NOT NULL,
+    game_size_y INTEGER NOT NULL,
+    mine_count INTEGER,
+    seed INTEGER,
+    moves BLOB,
+    engine TEXT
+);
+CREATE INDEX IF NOT EXISTS scores_player_name ON scores (player_name);
+CREATE INDEX IF NOT EXISTS scores_difficulty ON scores (
+    difficulty, to_reveal, time_spent, turns_used
+);
+CREATE INDEX IF NOT EXISTS scores_board_size ON scores (game_size_x, game_size_y);
+CREATE INDEX IF NOT EXISTS scores_date ON scores (ymd, time);
+CREATE INDEX IF NOT EXISTS scores_leaderboard ON scores (to_reveal, time_spent, turns_used);
+CREATE TABLE IF NOT EXISTS stats (
+    player_name TEXT NOT NULL,
+    difficulty TEXT NOT NULL,
+    game_size_x INTEGER NOT NULL,
+    game_size_y INTEGER NOT NULL,
+    games INTEGER NOT NULL,
+    wins INTEGER NOT NULL,
+    best_time INTEGER,
+    total_turns INTEGER NOT NULL,
+    streak INTEGER NOT NULL,
+    PRIMARY KEY (player_name, difficulty, game_size_x, game_size_y)
+);
+"""
+
+SELECT_SCORES = f"SELECT {', '.join(SCORE_COLUMNS)} FROM scores"
+INSERT_SCORE = (f"INSERT INTO scores ({', '.join(SCORE_COLUMNS)}) "
+                f"VALUES ({', '.join(':' + column for column in SCORE_COLUMNS)})")
+
+STATS_COLUMNS = STATS_KEY_FIELDS + STATS_FIELDS
+SELECT_STATS = (f"SELECT {', '.join(STATS_COLUMNS)} FROM stats "
+                f"WHERE {' AND '.join(f'{column} = ?' for column in STATS_KEY_FIELDS)}")
+REPLACE_STATS = (f"INSERT OR REPLACE INTO stats ({', '.join(STATS_COLUMNS)}) "
+                 f"VALUES ({', '.join(':' + column for column in STATS_COLUMNS)})")
+
+def record_from_row(cursor: sqlite3.Cursor, row: tuple) -> dict:
+    """
+    Row factory that gives the rows as score record dictionaries
+
+    Move logs are given as base64 text like in the JSON Lines records
+
+    :params sqlite3.Cursor cursor: cursor of the query
+    :params tuple row: selected row
+    """
+    return {column[0]: encode_move_log(value) if isinstance(value, bytes) else value
+            for column, value in zip(cursor.description, row)}
+
+def row_from_record(record: dict) -> dict:
+    """
+    Returns the insert parameters of a score record
+
+    Fields missing from older records are stored as NULL
+
+    :params dict record: score record
+    """
+    row = {column: record.get(column) for column in SCORE_COLUMNS}
+    if row["moves"] is not None:
+        row["moves"] = decode_move_log(row["moves"])
+    return row
+
+def connect(filename: str,
+            initial_records: Callable[[], Iterable[dict]] | None = None) -> sqlite3.Connection:
+    """
+    Opens the scoreboard database and creates its table and indexes if needed
+
+    When the database is created, the records given by `initial_records`
+    are inserted in the same transaction that marks it as initialized.
+    Databases created before the statistics table get their statistics
+    computed from the existing records, and databases created before the
+    replay or engine columns get the columns added
+
+    :params str filename: database file
+    :params Callable | None initial_records: function giving the records of a new database
+    """
+    connection = sqlite3.connect(filename)
+    connection.row_factory = record_from_row
+    connection.executescript(SCHEMA)
+    version = connection.execute("PRAGMA user_version").fetchone()["user_version"]
+    if version < SCHEMA_VERSION:
+        with connection:
+            if version == 0 and initial_records is not None:
+                connection.executemany(INSERT_SCORE, map(row_from_record, initial_records()))
+            if 0 < version < 3:
+                for column, column_type in REPLAY_COLUMNS:
+                    connection.execute(f"ALTER TABLE scores ADD COLUMN {column} {column_type}")
+            if 0 < version < 4:
+                connection.execute(f"ALTER TABLE scores ADD COLUMN {' '.join(ENGINE_COLUMN)}")
+            replace_stats(connection)
+            connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    return connection
+
+def insert_records(connection: sqlite3.Connection, records: list[dict]):
+    """
+    Inserts score records and updates their statistics in a single transaction
+
+    :params sqlite3.Connection connection: scoreboard database
+    :params list[dict] records: score records to be inserted
+    """
+    with connection:
+        connection.executemany(INSERT_SCORE, map(row_from_record, records))
+        for record in records:
+            stats = connection.execute(SELECT_STATS, scoreboard_stats.stats_key(record)).fetchone()
+            if stats is None:
+                stats = scoreboard_stats.new_stats(record)
+            scoreboard_stats.add_record(stats, record)
+            connection.execute(REPLACE_STATS, stats)
+
+def iter_records(connection: sqlite3.Connection) -> Iterator[dict]:
+    """
+    Yields all records in the order they were written
+
+    :params sqlite3.Connection connection: scoreboard database
+    """
+    yield from connection.execute(f"{SELECT_SCORES} ORDER BY id")
+
+def leaderboard(connection: sqlite3.Connection, limit: int, offset: int = 0) -> list[dict]:
+    """
+    Returns a page of the leaderboard where records are ordered by
+    tiles left unexplored, then time spent and then turns used
+
+    Records that tie are in the order they were written
+
+    :params sqlite3.Connection connection: scoreboard database
+    :params int limit: maximum amount of records
+    :params int offset: amount of best records skipped
+    """
+    return connection.execute(
+        f"{SELECT_SCORES} ORDER BY to_reveal, time_spent, turns_used, id LIMIT ? OFFSET ?",
+        (limit, offset)).fetchall()
+
+def top_wins(connection: sqlite3.Connection, difficulty: str, limit: int = 10) -> list[dict]:
+    """
+    Returns the fastest wins of a difficulty,
+    ties decided by the amount of turns
+
+    :params sqlite3.Connection connection: scoreboard database
+    :params str difficulty: difficulty name, such as "Easy"
+    :params int limit: maximum amount of records
+    """
+    return connection.execute(
+        f"{SELECT_SCORES} WHERE difficulty = ? AND to_reveal = 0 "
+        "ORDER BY time_spent, turns_used LIMIT ?",
+        (difficulty, limit)).fetchall()
+
+def player_history(connection: sqlite3.Connection,
+                   player_name: str,
+                   limit: int | None = None) -> list[dict]:
+    """
+    Returns the games of a player, latest first
+
+    :params sqlite3.Connection connection: scoreboard database
+    :params str player_name: name of the player
+    :params int | None limit: maximum amount of records, all if None
+    """
+    return connection.execute(
+        f"{SELECT_SCORES} WHERE player_name = ? ORDER BY id DESC LIMIT ?",
+        (player_name, -1 if limit is None else limit)).fetchall()
+
+def recent_games(connection: sqlite3.Connection, limit: int = 10) -> list[dict]:
+    """
+    Returns the latest games of all players, latest first
+
+    :params sqlite3.Connection connection: scoreboard database
+    :params int limit: maximum amount of records
+    """
+    return connection.execute(
+        f"{SELECT_SCORES} ORDER BY ymd DESC, time DESC, id DESC LIMIT ?",
+        (limit,)).fetchall()
+
+def replace_stats(connection: sqlite3.Connection):
+    """
+    Recomputes the statistics table from all records
+
+    Does not commit, the caller is expected to hold a transaction
+
+    :params sqlite3.Connection connection: scoreboard database
+    """
+    stats_by_key = scoreboard_stats.build_stats(iter_records(connection))
+    connection.execute("DELETE FROM stats")
+    connection.executemany(REPLACE_STATS, stats_by_key.values())
+
+def rebuild_stats(connection: sqlite3.Connection):
+    """
+    Recomputes the statistics table from all records in a transaction
+
+    :params sqlite3.Connection connection: scoreboard database
+    """
+    with connection:
+        replace_stats(connection)
+
+def all_stats(connection: sqlite3.Connection) -> list[dict]:
+    """
+    Returns all statistics entries ordered by player,
+    difficulty and board size
+
+    :params sqlite3.Connection connection: scoreboard database
+    """
+    return connection.execute(
+        f"SELECT {', '.join(STATS_COLUMNS)} FROM stats "
+        f"ORDER BY {', '.join(STATS_KEY_FIELDS)}").fetchall()
@@ -0,0 +1,117 @@
+"""
+Aggregated statistics of the scoreboard
+
+Statistics are kept per (player, difficulty, board size) and updated
+with every written record, so showing them does not depend on the
+size of the history. Each entry is a dictionary holding its key
+fields and the aggregates.
+
+The statistics file of the JSON Lines scoreboard stores the byte offset
+of the scoreboard up to which its records have been added. Writing a
+record only appends it to the scoreboard, the records after the offset
+are added when the statistics are read next.
+"""
+
+import json
+import os
+from collections.abc import Iterable
+
+STATS_FILENAME = "app/game_stats.json"
+
+STATS_KEY_FIELDS = ("player_name", "difficulty", "game_size_x", "game_size_y")
+STATS_FIELDS = ("games", "wins", "best_time", "total_turns", "streak")
+
+StatsKey = tuple[str, str, int, int]
+
+def stats_key(record: dict) -> StatsKey:
+    """
+    Returns the statistics key of a score record or statistics entry
+
+    :params dict record: score record or statistics entry
+    """
+    return tuple(record[field] for field in STATS_KEY_FIELDS)
+
+def new_stats(record: dict) -> dict:
+    """
+    Returns an empty statistics entry for the key of the given record
+
+    :params dict record: score record
+    """
+    stats = {field: record[field] for field in STATS_KEY_FIELDS}
+    stats.update({"games": 0, "wins": 0, "best_time": None, "total_turns": 0, "streak": 0})
+    return stats
+
+def add_record(stats: dict, record: dict):
+    """
+    Updates a statistics entry with a newer score record of the same key
+
+    :params dict stats: statistics entry to be updated
+    :params dict record: score record
+    """
+    stats["games"] += 1
+    stats["total_turns"] += record["turns_used"]
+    if record["to_reveal"] == 0:
+        stats["wins"] += 1
+        stats["streak"] += 1
+        if stats["best_time"] is None or record["time_spent"] < stats["best_time"]:
+            stats["best_time"] = record["time_spent"]
+    else:
+        stats["streak"] = 0
+
+def build_stats(records: Iterable[dict]) -> dict[StatsKey, dict]:
+    """
+    Computes the statistics of records given in the order they were written
+
+    :params Iterable[dict] records: score records
+    """
+    stats_by_key: dict[StatsKey, dict] = {}
+    for record in records:
+        key = stats_key(record)
+        if key not in stats_by_key:
+            stats_by_key[key] = new_stats(record)
+        add_record(stats_by_key[key], record)
+    return stats_by_key
+
+def average_turns(stats: dict) -> float:
+    """
+    Average amount of turns of the games of a statistics entry
+
+    :params dict stats: statistics entry
+    """
+    return stats["total_turns"] / stats["games"] if stats["games"] else 0.0
+
+def load_stats_file(filename: str = STATS_FILENAME
+                    ) -> tuple[dict[StatsKey, dict], int | None] | None:
+    """
+    Reads the statistics file kept next to the JSON Lines scoreboard
+
+    Returns the statistics entries by their key and the scoreboard offset
+    they cover, or None if the file does not exist. The offset is None
+    in files of earlier versions, which were saved with every record
+
+    :params str filename: statistics file
+    """
+    try:
+        with open(filename, 'r', encoding="UTF-8") as stats_file:
+            content = json.load(stats_file)
+    except FileNotFoundError:
+        return None
+    if isinstance(content, list):
+        return {stats_key(stats): stats for stats in content}, None
+    return {stats_key(stats): stats for stats in content["stats"]}, content["offset"]
+
+def save_stats_file(stats_by_key: dict[StatsKey, dict],
+                    offset: int,
+                    filename: str = STATS_FILENAME):
+    """
+    Replaces the statistics file atomically so that an
+    interrupted write keeps the previous statistics
+
+    :params dict stats_by_key: statistics entries by their key
+    :params int offset: scoreboard offset up to which the records are included
+    :params str filename: statistics file
+    """
+    temporary_filename = f"{filename}.tmp"
+    with open(temporary_filename, 'w', encoding="UTF-8") as stats_file:
+        json.dump({"offset": offset, "stats": list(stats_by_key.values())}, stats_file)
+    os.replace(temporary_filename, filename)
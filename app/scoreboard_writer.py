@@ -0,0 +1,103 @@
+"""
+Background writer of scoreboard records
+
+Finished games are queued from the pyglet event thread and written
+by a worker thread, so a slow disk or a large history never delays
+the click that ends a game. Records queued while a write is running
+are written together with a single flush.
+"""
+
+import queue
+import sys
+import threading
+
+from app import scoreboard_logging
+
+# Finished games that can wait for writing before queueing more blocks
+SCOREBOARD_QUEUE_SIZE = 64
+
+class ScoreboardWriter:
+    """
+    Worker thread writing queued records with `scoreboard_logging.append_records`
+
+    The thread is started on the first queued record and started again
+    if it has stopped. `close` must be called before the program exits
+    so that no queued record is lost
+    """
+    records: queue.Queue
+    thread: threading.Thread | None
+
+    def __init__(self, queue_size: int = SCOREBOARD_QUEUE_SIZE):
+        """
+        Initializes an empty queue without starting the worker thread
+
+        :params int queue_size: maximum amount of records waiting to be written
+        """
+        self.records = queue.Queue(queue_size)
+        self.thread = None
+
+    def submit(self, record: dict):
+        """
+        Queues a record for writing, waits only if the queue is full
+
+        :params dict record: record created with `scoreboard_logging.make_score_record`
+        """
+        self.start()
+        self.records.put(record)
+
+    def start(self):
+        """
+        Starts the worker thread if it is not running
+        """
+        if self.thread is None or not self.thread.is_alive():
+            self.thread = threading.Thread(target=self.write_records,
+                                           name="scoreboard-writer",
+                                           daemon=True)
+            self.thread.start()
+
+    def write_records(self):
+        """
+        Worker loop that writes every record currently in the queue as
+        one batch until it receives None from `close`
+
+        A batch that cannot be written is reported and dropped,
+        the loop keeps writing the following batches
+        """
+        while True:
+            batch = [self.records.get()]
+            while True:
+                try:
+                    batch.append(self.records.get_nowait())
+                except queue.Empty:
+                    break
+
+            records = [record for record in batch if record is not None]
+            try:
+                if records:
+                    scoreboard_logging.append_records(records)
+            except Exception as error: # pylint: disable=broad-exception-caught
+                print(f"\nCould not save {len(records)} scores: {error!r}", file=sys.stderr)
+            finally:
+                for _ in batch:
+                    self.records.task_done()
+
+            if len(records) < len(batch):
+                return
+
+    def flush(self):
+        """
+        Waits until all queued records have been written
+        """
+        if self.thread is not None:
+            self.start()
+            self.records.join()
+
+    def close(self):
+        """
+        Writes the queued records and stops the worker thread
+        """
+        if self.thread is not None:
+            self.start()
+            self.records.put(None)
+            self.thread.join()
+            self.thread = None
@@ -0,0 +1,235 @@
+"""
+Headless batch simulation of mine sweeper games
+
+Drives `Game` with a pluggable strategy without pyglet and shards
+the games across a `multiprocessing` pool. Used for calibrating the
+difficulty presets from the command line:
+
+    $ python -m app.simulation --size 16 16 --difficulty medium --games 100000
+"""
+
+import argparse
+import multiprocessing
+import random
+from collections.abc import Callable, Iterator
+
+from app.game import game_constants
+from app.game.game_state import Game
+from app.game.chunked_game_state import ChunkedGame
+from app.game.solver import Solver
+from app.game import NumpyGame
+
+# Creates the turn function that plays one turn of the given new game
+Strategy = Callable[[Game, random.Random], Callable[[], object]]
+
+def random_strategy(game: Game, rng: random.Random) -> Callable[[], object]:
+    """
+    Strategy that guesses a random unexplored and unflagged tile
+
+    :params Game game: game to be played
+    :params random.Random rng: random number generator of the simulation shard
+    """
+    def play_turn():
+        candidates = [(x_index, y_index)
+                      for y_index in range(game.board_size[1])
+                      for x_index in range(game.board_size[0])
+                      if not game.is_explored((x_index, y_index))
+                      and not game.is_flagged((x_index, y_index))]
+        game.guess_tile(rng.choice(candidates))
+    return play_turn
+
+def solver_strategy(game: Game, rng: random.Random) -> Callable[[], object]:
+    """
+    Strategy that plays with the constraint-propagation `Solver`
+
+    :params Game game: game to be played
+    :params random.Random rng: random number generator of the simulation shard
+    """
+    return Solver(game, rng).play_turn
+
+STRATEGIES: dict[str, Strategy] = {
+    "random": random_strategy,
+    "solver": solver_strategy
+}
+
+ENGINES: dict[str, type[Game]] = {
+    "list": Game,
+    "chunked": ChunkedGame
+}
+if NumpyGame is not None:
+    ENGINES["numpy"] = NumpyGame
+
+class SimulationStats:
+    """
+    Aggregate results of simulated games
+
+    Stats of separate shards are combined with `add`
+    """
+    games: int
+    wins: int
+    turns: int
+    to_reveal: int
+
+    def __init__(self):
+        """
+        Initializes empty stats
+        """
+        self.games = 0
+        self.wins = 0
+        self.turns = 0
+        self.to_reveal = 0
+
+    def add(self, other: "SimulationStats"):
+        """
+        Adds the results of another stats object into this one
+
+        :params SimulationStats other: stats to be added
+        """
+        self.games += other.games
+        self.wins += other.wins
+        self.turns += other.turns
+        self.to_reveal += other.to_reveal
+
+    @property
+    def win_rate(self) -> float:
+        """
+        Share of games won
+        """
+        return self.wins / self.games if self.games else 0.0
+
+    @property
+    def average_turns(self) -> float:
+        """
+        Average amount of turns per game
+        """
+        return self.turns / self.games if self.games else 0.0
+
+    @property
+    def average_to_reveal(self) -> float:
+        """
+        Average amount of tiles left unexplored per game
+        """
+        return self.to_reveal / self.games if self.games else 0.0
+
+def play_game(game: Game, strategy: Strategy, rng: random.Random) -> tuple[bool, int, int]:
+    """
+    Plays the given game until it is over
+
+    Returns a tuple of (win, turns used, tiles left to reveal)
+
+    :params Game game: new game to be played
+    :params Strategy strategy: strategy playing the turns
+    :params random.Random rng: random number generator passed to the strategy
+    """
+    play_turn = strategy(game, rng)
+    turns_used = 0
+    while not game.game_over:
+        play_turn()
+        turns_used += 1
+
+    total_tiles = game.board_size[0] * game.board_size[1]
+    to_reveal = total_tiles - game.mine_count - game.explored_count
+    if not game.win:
+        # The exploded mine was counted as explored
+        to_reveal += 1
+    return game.win, turns_used, to_reveal
+
+def run_shard(shard: tuple[tuple[int, int], int, int, str, str, int]) -> SimulationStats:
+    """
+    Plays one shard of games in a worker process
+
+    The seeds of the games and the strategy's choices are drawn from
+    a generator seeded with the shard seed, so a shard gives the same
+    results regardless of the worker it runs on
+
+    :params tuple shard: (board size, mine count, games, strategy name, engine name, seed)
+    """
+    board_size, mine_count, games, strategy_name, engine_name, seed = shard
+    strategy = STRATEGIES[strategy_name]
+    engine = ENGINES[engine_name]
+
+    rng = random.Random(seed)
+
+    stats = SimulationStats()
+    for _ in range(games):
+        game = engine(board_size, mine_count, rng.getrandbits(game_constants.SEED_BITS))
+        win, turns_used, to_reveal = play_game(game, strategy, rng)
+        stats.games += 1
+        stats.wins += int(win)
+        stats.turns += turns_used
+        stats.to_reveal += to_reveal
+    return stats
+
+def simulate(board_size: tuple[int, int],
+             mine_count: int,
+             games: int,
+             strategy_name: str = "random",
+             engine_name: str = "list",
+             processes: int | None = None,
+             shard_size: int = 1000,
+             seed: int = 0) -> Iterator[SimulationStats]:
+    """
+    Simulates `games` games split into shards over a process pool
+
+    Yields the running aggregate each time a shard finishes
+
+    :params tuple[int, int] board_size: board size in (x-size, y-size) format
+    :params int mine_count: number of mines on each board
+    :params int games: total number of games to simulate
+    :params str strategy_name: key of the strategy in `STRATEGIES`
+    :params str engine_name: key of the board engine in `ENGINES`
+    :params int | None processes: number of worker processes, defaults to CPU count
+    :params int shard_size: number of games played per shard
+    :params int seed: base seed from which the per-shard seeds are derived
+    """
+    shards = []
+    for shard_number, shard_start in enumerate(range(0, games, shard_size)):
+        shard_games = min(shard_size, games - shard_start)
+        shard_seed = (seed << 32) + shard_number
+        shards.append((board_size, mine_count, shard_games, strategy_name, engine_name, shard_seed))
+
+    total = SimulationStats()
+    with multiprocessing.Pool(processes) as pool:
+        for shard_stats in pool.imap_unordered(run_shard, shards):
+            total.add(shard_stats)
+            yield total
+
+def main():
+    """
+    Command line entry point for running simulations
+    """
+    difficulties = {
+        "easy": game_constants.DIFFICULTY_EASY,
+        "medium": game_constants.DIFFICULTY_MEDIUM,
+        "hard": game_constants.DIFFICULTY_HARD
+    }
+
+    parser = argparse.ArgumentParser(description="Simulate mine sweeper games headlessly")
+    parser.add_argument("--size", type=int, nargs=2, default=(16, 16), metavar=("X", "Y"))
+    parser.add_argument("--difficulty", choices=difficulties, default="easy")
+    parser.add_argument("--mines", type=int, help="mine count, overrides --difficulty")
+    parser.add_argument("--games", type=int, default=10000)
+    parser.add_argument("--strategy", choices=STRATEGIES, default="random")
+    parser.add_argument("--engine", choices=ENGINES, default="list")
+    parser.add_argument("--processes", type=int)
+    parser.add_argument("--shard-size", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    board_size = (args.size[0], args.size[1])
+    mine_count = args.mines
+    if mine_count is None:
+        density = game_constants.DIFFICULTY_MINE_DENSITY[difficulties[args.difficulty]]
+        mine_count = round(board_size[0] * board_size[1] * density)
+
+    print(f"Simulating {args.games} games on {board_size[0]}x{board_size[1]} "
+          f"with {mine_count} mines using the {args.strategy} strategy")
+    for stats in simulate(board_size, mine_count, args.games, args.strategy, args.engine,
+                          args.processes, args.shard_size, args.seed):
+        print(f"{stats.games} games: "
+              f"win rate {stats.win_rate:.4f}, "
+              f"{stats.average_turns:.2f} turns, "
+              f"{stats.average_to_reveal:.2f} tiles left")
+
+if __name__ == "__main__":
+    main()
@@ -3,9 +3,36 @@ Sprite helper module for drawing sprites
 and text on the pyglet window
 """
 
+from math import ceil
+
 from app.lib import sweeperlib
 from app.game import game_constants
 from app.game.game_state import Game
+from app.viewport import Viewport
+
+# Slot of the tilemap that draws the board on large boards
+TILEMAP_SLOT = "board"
+
+def get_tile_draw_key(game_state: Game, tile: tuple[int, int]) -> str:
+    """
+    Returns the sprite key of the given tile according to
+    its content, explored and flagged state and the game state
+
+    :params Game game_state: game that the tile belongs to
+    :params tuple[int, int] tile: tile (x,y) index-coordinates
+    """
+    draw_key = ' '
+    if game_state.is_explored(tile):
+        draw_key = game_state.get_tile_content(tile)
+
+    if game_state.is_flagged(tile):
+        draw_key = 'f'
+        if game_state.game_over and game_state.win is False:
+            if game_state.get_tile_content(tile) == 'x':
+                draw_key = 'x'
+            else:
+                draw_key = 'F'
+    return draw_key
 
 class SpriteHelper:
     """
@@ -13,95 +40,216 @@ class SpriteHelper:
     on the pyglet window
 
     Uses a reference of a Game to determine draw logic
+
+    Tiles are drawn through a viewport, only the visible tiles have
+    sprites. Tile sprites are kept in ("tile", column, row) slots
+    counted from the bottom left visible tile
+
+    With `use_tilemap` the visible tiles are drawn as one sweeperlib
+    tilemap instead, whose cells are counted the same way
     """
     game_state: Game
+    viewport: Viewport
+    cell_counts: tuple[int, int]
+    use_tilemap: bool
+    tilemap_size: tuple[int, int] | None
 
-    def __init__(self, game_state_instance: Game):
+    def __init__(self,
+                 game_state_instance: Game,
+                 viewport: Viewport | None = None,
+                 use_tilemap: bool = False):
         """
         Initializes the SpriteHelper object with
         the game state parameter
+
+        Tilemaps are used only if the sprites were loaded from the atlas
+
+        :params Game game_state_instance: drawn game
+        :params Viewport | None viewport: view of the board, the whole board if None
+        :params bool use_tilemap: True to draw the tiles as a tilemap
         """
         self.game_state = game_state_instance
+        self.viewport = viewport if viewport is not None else Viewport(
+            game_state_instance.board_size, game_state_instance.board_size_px)
+        self.cell_counts = (0, 0)
+        self.use_tilemap = use_tilemap
+        self.tilemap_size = None
+
+    def prepare_tile_sprite(self, tile: tuple[int, int]):
+        """
+        Places the sprite of one tile into its sprite slot to be drawn with
+        `sweeperlib.draw_sprite_slots()`, tiles outside the viewport are skipped
+
+        :params tuple[int, int] tile: tile (x,y) index-coordinates
+        """
+        if self.use_tilemap:
+            self.prepare_tilemap_tiles([tile])
+            return
+        x_start, y_start, x_stop, y_stop = self.viewport.visible_tiles()
+        if x_start <= tile[0] < x_stop and y_start <= tile[1] < y_stop:
+            self.place_tile_sprite(tile, (x_start, y_start))
+
+    def place_tile_sprite(self, tile: tuple[int, int], first_tile: tuple[int, int]):
+        """
+        Places the sprite of a visible tile into the cell slot
+        counted from the bottom left visible tile
+
+        :params tuple[int, int] tile: tile (x,y) index-coordinates
+        :params tuple[int, int] first_tile: bottom left visible tile
+        """
+        x_start, y_start = first_tile
+        x_pos, y_pos = self.viewport.tile_to_screen(tile)
+        sweeperlib.set_sprite(
+                    ("tile", tile[0] - x_start, tile[1] - y_start),
+                    get_tile_draw_key(self.game_state, tile),
+                    round(x_pos),
+                    round(y_pos),
+                    scale=self.viewport.zoom)
 
     def prepare_tile_sprites(self):
         """
-        Prepares the tile sprites to be drawn with
-        `sweeperlib.draw_sprites()`
+        Places the sprites of all visible tiles into their sprite slots to be
+        drawn with `sweeperlib.draw_sprite_slots()` and hides the slots left
+        over from a larger view
+
+        Draws the tiles with `prepare_tilemap` when a tilemap is used
+        """
+        if self.use_tilemap and not sweeperlib.can_draw_tilemaps():
+            self.use_tilemap = False
+        if self.use_tilemap:
+            self.prepare_tilemap()
+            return
+
+        x_start, y_start, x_stop, y_stop = self.viewport.visible_tiles()
+        for y_index in range(y_start, y_stop):
+            for x_index in range(x_start, x_stop):
+                self.place_tile_sprite((x_index, y_index), (x_start, y_start))
+
+        columns, rows = max(x_stop - x_start, 0), max(y_stop - y_start, 0)
+        old_columns, old_rows = self.cell_counts
+        for row in range(old_rows):
+            for column in range(columns if row < rows else 0, old_columns):
+                sweeperlib.hide_sprite(("tile", column, row))
+        self.cell_counts = (columns, rows)
+
+    def prepare_tilemap(self):
+        """
+        Places the tilemap over the visible tiles and sets all of its tiles
+
+        The tilemap is created on first use, large enough for
+        the view at the smallest zoom
         """
-        for y_index, row in enumerate(self.game_state.game_board):
-            for x_index, tile_content in enumerate(row):
-                draw_key = ' '
-                if (x_index, y_index) in self.game_state.explored_tiles:
-                    draw_key = tile_content
+        if self.tilemap_size is None:
+            min_tile_size = game_constants.TILE_SPRITE_SIZE_PX * self.viewport.min_zoom
+            self.tilemap_size = (ceil(self.viewport.size_px[0] / min_tile_size) + 1,
+                                 ceil(self.viewport.size_px[1] / min_tile_size) + 1)
+            sweeperlib.create_tilemap(TILEMAP_SLOT, *self.tilemap_size)
+
+        x_start, y_start, x_stop, y_stop = self.viewport.visible_tiles()
+        x_pos, y_pos = self.viewport.tile_to_screen((x_start, y_start))
+        sweeperlib.place_tilemap(TILEMAP_SLOT,
+                                 x_pos,
+                                 y_pos,
+                                 self.viewport.tile_size_px,
+                                 x_stop - x_start,
+                                 y_stop - y_start)
+        for y_index in range(y_start, y_stop):
+            sweeperlib.set_tilemap_tiles(
+                TILEMAP_SLOT,
+                (y_index - y_start) * self.tilemap_size[0],
+                [get_tile_draw_key(self.game_state, (x_index, y_index))
+                 for x_index in range(x_start, x_stop)])
 
-                if (x_index, y_index) in self.game_state.flagged_tiles:
-                    draw_key = 'f'
-                    if self.game_state.game_over and self.game_state.win is False:
-                        if tile_content == 'x':
-                            draw_key = 'x'
-                        else:
-                            draw_key = 'F'
+    def prepare_tilemap_tiles(self, tiles):
+        """
+        Sets the changed tiles of the tilemap, tiles outside the viewport
+        are skipped. Tiles next to each other on a row are set together
+        so that every run of tiles updates one slice of the tilemap
 
-                sweeperlib.prepare_sprite(
-                            draw_key,
-                            x_index * game_constants.TILE_SPRITE_SIZE_PX,
-                            y_index * game_constants.TILE_SPRITE_SIZE_PX)
+        :params tiles: iterable of changed tile (x,y) index-coordinates
+        """
+        x_start, y_start, x_stop, y_stop = self.viewport.visible_tiles()
+        columns = self.tilemap_size[0]
+        run_start, run_keys = 0, []
+        for y_index, x_index in sorted((tile[1], tile[0]) for tile in tiles
+                                       if x_start <= tile[0] < x_stop
+                                       and y_start <= tile[1] < y_stop):
+            index = (y_index - y_start) * columns + x_index - x_start
+            if run_keys and index != run_start + len(run_keys):
+                sweeperlib.set_tilemap_tiles(TILEMAP_SLOT, run_start, run_keys)
+                run_keys = []
+            if not run_keys:
+                run_start = index
+            run_keys.append(get_tile_draw_key(self.game_state, (x_index, y_index)))
+        if run_keys:
+            sweeperlib.set_tilemap_tiles(TILEMAP_SLOT, run_start, run_keys)
 
     def prepare_timer_sprites(self):
         """
-        Prepares timer sprites to be drawn with
-        `sweeperlib.draw_sprites()`
+        Places timer sprites into their sprite slots to be drawn with
+        `sweeperlib.draw_sprite_slots()`
         """
         timer_str = f"{self.game_state.remaining_time:03}"
         for pos, timer_char in enumerate(timer_str):
-            sweeperlib.prepare_sprite(
+            sweeperlib.set_sprite(
+                    ("timer", pos),
                     f"display-{timer_char}",
-                    (self.game_state.board_size_px[0] - 3 * game_constants.TILE_SPRITE_SIZE_PX)
+                    (self.viewport.size_px[0] - 3 * game_constants.TILE_SPRITE_SIZE_PX)
                     + pos * game_constants.TILE_SPRITE_SIZE_PX - 4,
-                    self.game_state.board_size_px[1] + 11)
+                    self.viewport.size_px[1] + 11)
 
     def prepare_mine_counter_sprites(self):
         """
-        Prepares mine counter sprites to be drawn with
-        `sweeperlib.draw_sprites()`
+        Places mine counter sprites into their sprite slots to be drawn with
+        `sweeperlib.draw_sprite_slots()`
         """
-        n_mines_left: int = self.game_state.mine_count - len(self.game_state.flagged_tiles)
+        # The counter has three digits like the timer
+        n_mines_left: int = min(self.game_state.mine_count - self.game_state.flagged_count, 999)
         n_mines_left_str: str = f"{n_mines_left:03}"
         for pos, n_mines_left_char in enumerate(n_mines_left_str):
-            sweeperlib.prepare_sprite(
+            sweeperlib.set_sprite(
+                    ("mine-counter", pos),
                     f"display-{n_mines_left_char}",
                     pos * game_constants.TILE_SPRITE_SIZE_PX + 4,
-                    self.game_state.board_size_px[1] + 11)
+                    self.viewport.size_px[1] + 11)
 
     def prepare_face_sprite(self):
         """
-        Prepares the face sprite to be drawn with
-        `sweeperlib.draw_sprites()`
+        Places the face sprite into its sprite slot to be drawn with
+        `sweeperlib.draw_sprite_slots()`
         """
         face_draw_key = "face-smiley"
         if self.game_state.game_over:
             face_draw_key = "face-lose"
         if self.game_state.win:
             face_draw_key = "face-win"
-        sweeperlib.prepare_sprite(
+        sweeperlib.set_sprite(
+                "face",
                 face_draw_key,
-                round(self.game_state.board_size_px[0]/2) - game_constants.FACE_SPRITE_SIZE_PX/2,
-                self.game_state.board_size_px[1] + 18
+                round(self.viewport.size_px[0]/2) - game_constants.FACE_SPRITE_SIZE_PX/2,
+                self.viewport.size_px[1] + 18
                 )
 
-    def draw_end_card(self):
+    def prepare_end_card(self):
         """
-        Draws the end card on the screen
+        Places the end card plate and text into their slots above the
+        board when the game is over and hides them otherwise
 
         Content depends on `game_state.win` attribute
         """
-        sweeperlib.begin_sprite_draw()
-        sweeperlib.prepare_sprite(
+        if not self.game_state.game_over:
+            sweeperlib.hide_sprite("end-plate")
+            sweeperlib.hide_text("end-message")
+            sweeperlib.hide_text("end-hint")
+            return
+
+        sweeperlib.set_sprite(
+                "end-plate",
                 "end-plate",
-                round(self.game_state.board_size_px[0]/2) - 192,
-                round(self.game_state.board_size_px[1]/2)
+                round(self.viewport.size_px[0]/2) - 192,
+                round(self.viewport.size_px[1]/2),
+                layer=1
                 )
-        sweeperlib.draw_sprites()
 
         win_msg = "You lost!"
         msg_color = (255, 0, 0, 255)
@@ -109,17 +257,19 @@ class SpriteHelper:
             win_msg = "You win!"
             msg_color = (0, 255, 0, 255)
 
-        sweeperlib.draw_text(
+        sweeperlib.set_text(
+                "end-message",
                 win_msg,
-                (round(self.game_state.board_size_px[0]/2) - 174,
-                round(self.game_state.board_size_px[1]/2) + 82),
+                (round(self.viewport.size_px[0]/2) - 174,
+                round(self.viewport.size_px[1]/2) + 82),
                 color=msg_color,
                 size=48
                 )
-        sweeperlib.draw_text(
+        sweeperlib.set_text(
+                "end-hint",
                 "Click to return.",
-                (round(self.game_state.board_size_px[0]/2) - 174,
-                round(self.game_state.board_size_px[1]/2) + 48),
+                (round(self.viewport.size_px[0]/2) - 174,
+                round(self.viewport.size_px[1]/2) + 48),
                 size=24
                 )
 
@@ -129,16 +279,29 @@ class SpriteHelper:
 
         Set with `sweeperlib.set_draw_handler`
         """
+        # Clearing paints the background color, so only
+        # the atlas texture is bound while drawing the frame
         sweeperlib.clear_window()
-        sweeperlib.draw_background()
-        sweeperlib.begin_sprite_draw()
 
-        self.prepare_tile_sprites()
-        self.prepare_timer_sprites()
-        self.prepare_mine_counter_sprites()
-        self.prepare_face_sprite()
+        # Only the sprites affected by changes in the game
+        # state since the last frame are updated
+        journal = self.game_state.journal
+        if journal.full:
+            self.prepare_tile_sprites()
+            self.prepare_timer_sprites()
+            self.prepare_mine_counter_sprites()
+            self.prepare_face_sprite()
+            self.prepare_end_card()
+        else:
+            if self.use_tilemap:
+                self.prepare_tilemap_tiles(journal.tiles)
+            else:
+                for tile in journal.tiles:
+                    self.prepare_tile_sprite(tile)
+            if journal.timer:
+                self.prepare_timer_sprites()
+            if journal.mine_counter:
+                self.prepare_mine_counter_sprites()
+        journal.clear()
 
-        sweeperlib.draw_sprites()
-
-        if self.game_state.game_over:
-            self.draw_end_card()
+        sweeperlib.draw_sprite_slots()
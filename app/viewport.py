@@ -0,0 +1,151 @@
+"""
+Viewport of the game board
+
+Boards bigger than the window are drawn through a viewport that can be
+scrolled and zoomed. Only the tiles inside the viewport are given sprites,
+so drawing does not depend on the size of the board.
+"""
+
+from math import floor
+
+from app.game import game_constants
+
+class Viewport:
+    """
+    Scrollable and zoomable view of the board
+
+    `offset` is the board pixel at the bottom left corner of the view
+    in unzoomed board pixels, the view is `size_px` window pixels large
+    """
+    board_size: tuple[int, int]
+    size_px: tuple[int, int]
+    offset: tuple[float, float]
+    zoom: float
+    min_zoom: float
+
+    def __init__(self, board_size: tuple[int, int], size_px: tuple[int, int]):
+        """
+        Initializes a viewport at the bottom left corner of the board
+
+        The view cannot be zoomed out further than the whole board
+
+        :params tuple[int, int] board_size: board size in (x-size, y-size) format
+        :params tuple[int, int] size_px: size of the view on the window in pixels
+        """
+        self.board_size = board_size
+        self.size_px = size_px
+        self.offset = (0.0, 0.0)
+        self.zoom = game_constants.VIEWPORT_MAX_ZOOM
+        board_size_px = (board_size[0] * game_constants.TILE_SPRITE_SIZE_PX,
+                         board_size[1] * game_constants.TILE_SPRITE_SIZE_PX)
+        self.min_zoom = min(game_constants.VIEWPORT_MAX_ZOOM,
+                            max(game_constants.VIEWPORT_MIN_ZOOM,
+                                min(size_px[0] / board_size_px[0], size_px[1] / board_size_px[1])))
+
+    @property
+    def tile_size_px(self) -> float:
+        """
+        Size of a tile on the window in pixels
+        """
+        return game_constants.TILE_SPRITE_SIZE_PX * self.zoom
+
+    def clamp(self):
+        """
+        Keeps the view inside the board
+        """
+        limits = [max(self.board_size[axis] * game_constants.TILE_SPRITE_SIZE_PX
+                      - self.size_px[axis] / self.zoom, 0.0)
+                  for axis in range(2)]
+        self.offset = (min(max(self.offset[0], 0.0), limits[0]),
+                       min(max(self.offset[1], 0.0), limits[1]))
+
+    def center_on(self, tile: tuple[int, int]):
+        """
+        Moves the view so that the given tile is in its middle
+
+        :params tuple[int, int] tile: tile (x,y) index-coordinates
+        """
+        tile_size = game_constants.TILE_SPRITE_SIZE_PX
+        self.offset = ((tile[0] + 0.5) * tile_size - self.size_px[0] / self.zoom / 2,
+                       (tile[1] + 0.5) * tile_size - self.size_px[1] / self.zoom / 2)
+        self.clamp()
+
+    def scroll(self, delta_x: float, delta_y: float) -> bool:
+        """
+        Moves the board by the given amount of window pixels
+
+        Returns True if the view changed
+
+        :params float delta_x: horizontal movement in window pixels
+        :params float delta_y: vertical movement in window pixels
+        """
+        old_offset = self.offset
+        self.offset = (self.offset[0] - delta_x / self.zoom,
+                       self.offset[1] - delta_y / self.zoom)
+        self.clamp()
+        return self.offset != old_offset
+
+    def zoom_at(self, position: tuple[float, float], factor: float) -> bool:
+        """
+        Multiplies the zoom by the factor keeping the board
+        position under the given window position in place
+
+        Returns True if the view changed
+
+        :params tuple[float, float] position: window position to zoom at
+        :params float factor: zoom multiplier
+        """
+        new_zoom = min(max(self.zoom * factor, self.min_zoom), game_constants.VIEWPORT_MAX_ZOOM)
+        if new_zoom == self.zoom:
+            return False
+        board_x = self.offset[0] + position[0] / self.zoom
+        board_y = self.offset[1] + position[1] / self.zoom
+        self.zoom = new_zoom
+        self.offset = (board_x - position[0] / new_zoom, board_y - position[1] / new_zoom)
+        self.clamp()
+        return True
+
+    def visible_tiles(self) -> tuple[int, int, int, int]:
+        """
+        Returns the (x-start, y-start, x-stop, y-stop) range of the tiles
+        to be drawn, stops are exclusive
+
+        Tiles cut by the top edge of the view are left out so that
+        the board is not drawn over the header above it
+        """
+        tile_size = game_constants.TILE_SPRITE_SIZE_PX
+        x_start = floor(self.offset[0] / tile_size)
+        y_start = floor(self.offset[1] / tile_size)
+        x_stop = floor((self.offset[0] + self.size_px[0] / self.zoom) / tile_size - 1e-9) + 1
+        y_stop = floor((self.offset[1] + self.size_px[1] / self.zoom) / tile_size + 1e-9)
+        return (max(x_start, 0), max(y_start, 0),
+                min(x_stop, self.board_size[0]), min(y_stop, self.board_size[1]))
+
+    def is_visible(self, tile: tuple[int, int]) -> bool:
+        """
+        Returns True if the tile is in the range of `visible_tiles`
+
+        :params tuple[int, int] tile: tile (x,y) index-coordinates
+        """
+        x_start, y_start, x_stop, y_stop = self.visible_tiles()
+        return x_start <= tile[0] < x_stop and y_start <= tile[1] < y_stop
+
+    def tile_to_screen(self, tile: tuple[int, int]) -> tuple[float, float]:
+        """
+        Returns the window position of the bottom left corner of a tile
+
+        :params tuple[int, int] tile: tile (x,y) index-coordinates
+        """
+        tile_size = game_constants.TILE_SPRITE_SIZE_PX
+        return ((tile[0] * tile_size - self.offset[0]) * self.zoom,
+                (tile[1] * tile_size - self.offset[1]) * self.zoom)
+
+    def screen_to_tile(self, position: tuple[float, float]) -> tuple[int, int]:
+        """
+        Returns the (x,y) index-coordinates of the tile at a window position
+
+        :params tuple[float, float] position: window position
+        """
+        tile_size = game_constants.TILE_SPRITE_SIZE_PX
+        return (floor((self.offset[0] + position[0] / self.zoom) / tile_size),
+                floor((self.offset[1] + position[1] / self.zoom) / tile_size))
@@ -3,26 +3,49 @@ Main program script
 
 The user interface and the game is started from here
 """
-from app import print_scores
+from app import print_scores, print_stats, prompt_yes_no
 from app.game.game_handler import GameHandler
+from app.game.board_pool import BoardPool
+from app.scoreboard_writer import ScoreboardWriter
 
-def main_menu():
+def show_scoreboard(score_writer: ScoreboardWriter):
+    """
+    Prints the scoreboard one page at a time
+    while the user wants to see more
+
+    :params ScoreboardWriter score_writer: writer whose queued scores are shown too
+    """
+    score_writer.flush()
+    page = 0
+    while print_scores(page=page):
+        if not prompt_yes_no("Show the next page? (y/n): "):
+            break
+        page += 1
+
+def main_menu(board_pool: BoardPool, score_writer: ScoreboardWriter):
     """
     Main menu loop for the UI
 
     Launches the user-selected action
+
+    :params BoardPool board_pool: pool of pregenerated no-guess boards
+    :params ScoreboardWriter score_writer: background writer of finished games
     """
     while True:
         print("===  Minesweeper  ===")
         print("Type an action and press enter")
         print("  Play a new game -> n")
         print("  View scoreboard -> s")
+        print("  View statistics -> t")
         print("  Quit game       -> q")
         match input("> ").lower():
             case 'n':
-                GameHandler().start_game()
+                GameHandler(board_pool, score_writer).start_game()
             case 's':
-                print_scores()
+                show_scoreboard(score_writer)
+            case 't':
+                score_writer.flush()
+                print_stats()
             case 'q':
                 print("Goodbye...")
                 break
@@ -30,11 +53,17 @@ def main_menu():
                 print("\nNot a valid action. Try again.\n")
 
 if __name__ == "__main__":
+    no_guess_boards = BoardPool()
+    score_writer = ScoreboardWriter()
     try:
-        main_menu()
+        main_menu(no_guess_boards, score_writer)
     # Catch ^C
     except KeyboardInterrupt:
         print("\nExiting!")
     # Catch ^D
     except EOFError:
         print("\nExiting!")
+    finally:
+        # Scores of finished games are written before exiting
+        score_writer.close()
+        no_guess_boards.close()